@@ -1,4 +1,6 @@
-from brief_agent.utils.scheduler import start
+import sys
+
+from brief_agent.cli import main
 
 if __name__ == "__main__":
-    start()
\ No newline at end of file
+    sys.exit(main())
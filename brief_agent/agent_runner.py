@@ -7,34 +7,99 @@ Usage (local):
 The runner:
 1. Builds an OpenAI chat with function‑calling.
 2. Exposes the tool stubs (news, meetings, weather, markets).
-3. Iterates until the assistant returns the final e‑mail body.
+3. Runs the deterministic tool plan itself, then iterates until the
+   assistant returns the final e‑mail body; each turn's model is picked by
+   brief_agent.router within the run's latency and cost budgets.
 """
 
 import datetime
 import json
 import logging
 import os
-from dotenv import load_dotenv
-load_dotenv()
-from openai import OpenAI
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 
-from brief_agent.tools.news import get_headlines
-from brief_agent.tools.calendar_ms import get_meetings
-from brief_agent.tools.weather import get_weather
-from brief_agent.tools.market import get_financials
-from brief_agent.utils.emailer import send_email
+from brief_agent.config import load_env
+from brief_agent.router import SYNTHESIS, TOOL_SELECTION, Router, validate_body
 
-LOG_DIR = os.getenv("LOG_DIR", "logs")
 MODEL = "gpt-4-0613"
 
+# Tool modules pull in requests/msal at import time, so they are only
+# imported when a tool is actually called (see call_tool).
+TOOL_NAMES = ("get_headlines", "get_meetings", "get_weather", "get_financials")
+
+# ---------- function signatures -------------------------------------------------
+FUNCTIONS = [
+    {
+        "name": "get_headlines",
+        "description": (
+            "Return top AU‑relevant tech/biz headlines for the date."
+            " If 'query' is supplied, it replaces the default topic search"
+            " for every configured news source."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "iso_date": {"type": "string"},
+                "query": {"type": "string"},
+                "page_size": {"type": "integer"},
+            },
+            "required": ["iso_date"],
+        },
+    },
+    {
+        "name": "get_meetings",
+        "description": (
+            "Return the day's meetings (start, end, summary) in local HH:MM time,"
+            " plus precomputed conflicts, back-to-back runs, free blocks, focus"
+            " minutes and tight in-person transitions. All-day events are listed"
+            " separately under 'all_day'; meetings marked show_as 'free' and"
+            " all-day events do not count as busy time."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {"iso_date": {"type": "string"}},
+            "required": ["iso_date"],
+        },
+    },
+    {
+        "name": "get_weather",
+        "description": (
+            "Return min/max °C and rain chance for the given date."
+            " If 'meeting_times' are supplied (HH:MM in the briefing's local"
+            " timezone, i.e. the start times returned by get_meetings), also"
+            " return those where an umbrella is advisable. Extra 'locations'"
+            " (e.g. other recipients' cities) are fetched in the same request."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "iso_date": {"type": "string"},
+                "location": {"type": "string"},
+                "locations": {"type": "array", "items": {"type": "string"}},
+                "meeting_times": {"type": "array", "items": {"type": "string"}},
+            },
+            "required": ["iso_date"],
+        },
+    },
+    {
+        "name": "get_financials",
+        "description": "Return latest AUD→USD fx rate and NASDAQ previous close.",
+        "parameters": {"type": "object", "properties": {}},
+    },
+]
+
 
 def _setup_logger(today_iso: str) -> logging.Logger:
-    os.makedirs(LOG_DIR, exist_ok=True)
+    # read here, not at import, so a LOG_DIR set in .env (see load_env) applies
+    log_dir = os.getenv("LOG_DIR", "logs")
+    os.makedirs(log_dir, exist_ok=True)
     logger = logging.getLogger("briefing")
     logger.setLevel(logging.INFO)
     logger.handlers.clear()
     fmt = logging.Formatter("%(asctime)s %(levelname)s %(message)s", "%Y-%m-%d %H:%M:%S")
-    fh = logging.FileHandler(os.path.join(LOG_DIR, f"briefing_{today_iso}.log"))
+    fh = logging.FileHandler(os.path.join(log_dir, f"briefing_{today_iso}.log"))
     fh.setFormatter(fmt)
     logger.addHandler(fh)
     sh = logging.StreamHandler()
@@ -43,10 +108,136 @@ def _setup_logger(today_iso: str) -> logging.Logger:
     return logger
 
 
-def run_briefing() -> None:
-    """Main orchestration loop using OpenAI function‑calling."""
+def call_tool(fn_name: str, args: dict):
+    """
+    Invoke a tool by its function-calling name and return a JSON-serialisable
+    payload. The tool module is imported on first use.
+    """
+    if fn_name == "get_headlines":
+        from brief_agent.tools.news import get_headlines
+        res = get_headlines(**args)
+        return [
+            {
+                "title": h.title,
+                "url": h.url,
+                "source": h.source,
+                "published": h.published.isoformat() if h.published else None,
+            }
+            for h in res
+        ]
+    if fn_name == "get_meetings":
+        from brief_agent.tools.calendar_ms import get_meetings
+        from brief_agent.utils.analytics import summarize
+        return summarize(get_meetings(**args), args["iso_date"])
+    if fn_name == "get_weather":
+        from brief_agent.tools.weather import (
+            default_location, get_weather, get_weather_bulk, umbrella_times,
+        )
+        args = dict(args)
+        meeting_times = args.pop("meeting_times", None)
+        extra = args.pop("locations", None) or [
+            loc.strip() for loc in os.getenv("WEATHER_LOCATIONS", "").split(",") if loc.strip()
+        ]
+        forecasts, w = {}, None
+        if extra:
+            # one bulk request for the primary and every extra location; extra
+            # locations are best effort and never cost the primary forecast
+            primary = args.get("location") or default_location()
+            try:
+                forecasts = get_weather_bulk(args["iso_date"], [primary] + [l for l in extra if l != primary])
+            except Exception:
+                pass
+            w = forecasts.pop(primary, None)
+        if w is None:
+            w = get_weather(**args)
+        payload = {"min_c": w.min_c, "max_c": w.max_c, "rain_chance_pct": w.rain_chance_pct}
+        if forecasts:
+            payload["locations"] = {
+                loc: {"min_c": f.min_c, "max_c": f.max_c, "rain_chance_pct": f.rain_chance_pct}
+                for loc, f in forecasts.items()
+            }
+        if meeting_times:
+            payload["umbrella_at"] = umbrella_times(
+                args["iso_date"], meeting_times, args.get("location")
+            )
+        return payload
+    if fn_name == "get_financials":
+        from brief_agent.tools.market import get_financials
+        aud_usd, nasdaq = get_financials()
+        return {"aud_usd": aud_usd, "nasdaq_close": nasdaq}
+    return {}
+
+
+def _argument_error(fn_name: str, args) -> str | None:
+    """
+    Why a model's function call does not match FUNCTIONS, or None: unknown
+    name, non-object arguments, missing or unknown keys, or a bad iso_date.
+    """
+    spec = next((f for f in FUNCTIONS if f["name"] == fn_name), None)
+    if spec is None:
+        return f"unknown function {fn_name!r}"
+    if not isinstance(args, dict):
+        return f"malformed arguments for {fn_name}"
+    params = spec["parameters"]
+    missing = [k for k in params.get("required", []) if k not in args]
+    if missing:
+        return f"{fn_name} called without {', '.join(missing)}"
+    unknown = sorted(set(args) - set(params["properties"]))
+    if unknown:
+        return f"{fn_name} called with unknown {', '.join(unknown)}"
+    if "iso_date" in args:
+        try:
+            datetime.date.fromisoformat(str(args["iso_date"]))
+        except ValueError:
+            return f"{fn_name} called with invalid iso_date {args['iso_date']!r}"
+    return None
+
+
+def run_briefing(profile: bool = False) -> None:
+    """
+    Run one briefing, recording run metrics and a row in the SQLite run
+    history whatever the outcome. With `profile` (or for a
+    PROFILE_SAMPLE_RATE share of runs) CPU and allocation reports are
+    written next to the log.
+    """
+    from brief_agent.utils import metrics
+    from brief_agent.utils.profiling import profiled, should_profile
+
+    load_env()
+    metrics.instrument_requests()
     today_iso = datetime.date.today().isoformat()
     logger = _setup_logger(today_iso)
+    usage = {"prompt_tokens": 0, "completion_tokens": 0}
+    started = time.time()
+    status, error = "error", None
+    try:
+        profiler = profiled("run", deterministic=profile) if profile or should_profile() else nullcontext()
+        with profiler:
+            _run_briefing(today_iso, logger, usage)
+        status = "ok"
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        duration = time.time() - started
+        metrics.RUNS.inc(status=status)
+        metrics.RUN_DURATION.observe(duration)
+        if status == "ok":
+            metrics.LAST_SUCCESS.set(time.time())
+        logger.info("Run %s in %.1fs (tokens: %s)", status, duration, usage)
+        try:
+            metrics.record_run(started, duration, status, error, **usage)
+        except Exception as e:
+            logger.error("Could not record run history: %s", e)
+
+
+def _run_briefing(today_iso: str, logger: logging.Logger, usage: dict) -> None:
+    """Main orchestration loop using OpenAI function‑calling."""
+    from openai import OpenAI
+    from brief_agent.utils import metrics
+    from brief_agent.utils.emailer import send_email
+    from brief_agent.utils.postprocess import finalize, prefetch_links
+
     logger.info("Starting briefing run for %s", today_iso)
 
     api_key = os.getenv("OPENAI_API_KEY")
@@ -54,49 +245,6 @@ def run_briefing() -> None:
         raise RuntimeError("OPENAI_API_KEY not set in environment")
     client = OpenAI(api_key=api_key)
 
-    # ---------- function signatures -------------------------------------------------
-    functions = [
-        {
-            "name": "get_headlines",
-            "description": (
-                "Return top AU‑relevant tech/biz headlines for the date."
-                " If 'query' is supplied, use it verbatim in the NewsAPI request."
-            ),
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "iso_date": {"type": "string"},
-                    "query": {"type": "string"},
-                    "page_size": {"type": "integer"},
-                },
-                "required": ["iso_date"],
-            },
-        },
-        {
-            "name": "get_meetings",
-            "description": "Return calendar events (start, end, summary) for the given date.",
-            "parameters": {
-                "type": "object",
-                "properties": {"iso_date": {"type": "string"}},
-                "required": ["iso_date"],
-            },
-        },
-        {
-            "name": "get_weather",
-            "description": "Return min/max °C and rain chance for the given date.",
-            "parameters": {
-                "type": "object",
-                "properties": {"iso_date": {"type": "string"}},
-                "required": ["iso_date"],
-            },
-        },
-        {
-            "name": "get_financials",
-            "description": "Return latest AUD→USD fx rate and NASDAQ previous close.",
-            "parameters": {"type": "object", "properties": {}},
-        },
-    ]
-
     # ---------- conversation bootstrap ----------------------------------------------
     messages = [
         {
@@ -110,7 +258,8 @@ def run_briefing() -> None:
                 "<strong>1. TECHNICAL HEADLINES</strong> – A table of 5 top news items on Generative AI, quantum computing, and robotics. "
                 "Include both Australian and US developments relevant to a technology consulting business in Australia. "
                 "Format as an HTML table with columns 'Headline' and 'Link', using anchor tags for shortened URLs.<br>\n"
-                "<strong>2. MEETINGS & COMMITMENTS</strong> – HH:MM AEST schedule.<br>\n"
+                "<strong>2. MEETINGS & COMMITMENTS</strong> – HH:MM AEST schedule as returned by get_meetings; "
+                "call out conflicts, tight transitions and focus time from its precomputed fields.<br>\n"
                 "<strong>3. WEATHER</strong> – Melbourne CBD forecast.<br>\n"
                 "<strong>4. MARKETS OVERNIGHT</strong> – AUD→USD rate and NASDAQ previous close.<br>\n<br>\n"
                 "Omit any section with no data. Use only the provided functions; no external calls. "
@@ -127,60 +276,136 @@ def run_briefing() -> None:
         },
     ]
 
-    # ---------- main loop -----------------------------------------------------------
-    while True:
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=messages,
-            functions=functions,
-            function_call="auto",
-        )
-        msg = response.choices[0].message
+    # structured tool results, reused for the text/plain part
+    payloads: dict = {}
 
-        if getattr(msg, "function_call", None) is None:
-            email_body = msg.content
-            break
+    router = Router(large_model=MODEL, logger=logger)
 
-        fn_call = msg.function_call
-        fn_name = fn_call.name
-        args = json.loads(fn_call.arguments or "{}")
-        logger.info("Calling function %s with args %s", fn_name, args)
+    def complete(model: str):
+        try:
+            with metrics.LLM_LATENCY.time(model=model):
+                response = client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    functions=FUNCTIONS,
+                    function_call="auto",
+                )
+        except Exception:
+            metrics.LLM_CALLS.inc(model=model, status="error")
+            raise
+        metrics.LLM_CALLS.inc(model=model, status="ok")
+        if response.usage is not None:
+            tokens = {}
+            for kind in ("prompt_tokens", "completion_tokens"):
+                n = getattr(response.usage, kind, 0) or 0
+                tokens[kind] = n
+                usage[kind] += n
+                metrics.LLM_TOKENS.inc(n, model=model, kind=kind.split("_")[0])
+            router.charge(model, **tokens)
+        return response.choices[0].message
 
+    def run_tool(fn_name: str, args: dict):
+        logger.info("Calling function %s with args %s", fn_name, args)
         # retry wrapper
         max_attempts = 3
         for attempt in range(1, max_attempts + 1):
             try:
-                if fn_name == "get_headlines":
-                    res = get_headlines(**args)
-                    payload = [{"title": h.title, "url": h.url} for h in res]
-                elif fn_name == "get_meetings":
-                    res = get_meetings(**args)
-                    payload = [
-                        {"start": m.start.isoformat(), "end": m.end.isoformat(), "summary": m.summary}
-                        for m in res
-                    ]
-                elif fn_name == "get_weather":
-                    w = get_weather(**args)
-                    payload = {"min_c": w.min_c, "max_c": w.max_c, "rain_chance_pct": w.rain_chance_pct}
-                elif fn_name == "get_financials":
-                    aud_usd, nasdaq = get_financials()
-                    payload = {"aud_usd": aud_usd, "nasdaq_close": nasdaq}
-                else:
-                    payload = {}
+                with metrics.TOOL_LATENCY.time(tool=fn_name):
+                    payload = call_tool(fn_name, args)
+                metrics.TOOL_CALLS.inc(tool=fn_name, status="ok")
                 break  # success
             except Exception as e:
+                metrics.TOOL_CALLS.inc(tool=fn_name, status="error")
                 logger.error("Error in %s attempt %s/%s: %s", fn_name, attempt, max_attempts, e)
                 if attempt == max_attempts:
                     raise
+        payloads[fn_name] = payload
+        if fn_name == "get_headlines":
+            # resolve redirect links while the model keeps working
+            prefetch_links(h["url"] for h in payload)
+        return payload
+
+    # ---------- deterministic tool plan (replaces tool-selection turns) -------------
+    plan = router.plan_tools(today_iso, TOOL_NAMES)
+    if plan:
+        futures = {}
+
+        def run_planned(fn_name: str, args: dict):
+            if fn_name == "get_weather" and "get_meetings" in futures:
+                # umbrella advice needs the day's (local) meeting start times
+                meetings = futures["get_meetings"].result()[1]
+                args = {**args, "meeting_times": [m["start"] for m in meetings["meetings"]]}
+            return args, run_tool(fn_name, args)
+
+        with ThreadPoolExecutor(max_workers=len(plan)) as pool:
+            # TOOL_NAMES lists get_meetings before get_weather, which waits on it
+            for fn_name, args in plan:
+                futures[fn_name] = pool.submit(run_planned, fn_name, args)
+            results = [futures[fn_name].result() for fn_name, _ in plan]
+        for (fn_name, _), (args, payload) in zip(plan, results):
+            messages.append({
+                "role": "assistant",
+                "content": None,
+                "function_call": {"name": fn_name, "arguments": json.dumps(args)},
+            })
+            messages.append({"role": "function", "name": fn_name, "content": json.dumps(payload)})
+
+    # ---------- main loop -----------------------------------------------------------
+    fallback_reason = None
+    while True:
+        phase = SYNTHESIS if all(name in payloads for name in TOOL_NAMES) else TOOL_SELECTION
+        if fallback_reason:
+            decision = router.fallback(phase, fallback_reason)
+            fallback_reason = None
+        else:
+            decision = router.choose(phase, messages)
+        msg = complete(decision.model)
+
+        small = decision.model != MODEL
+        if getattr(msg, "function_call", None) is None:
+            email_body = msg.content
+            if small and phase == TOOL_SELECTION:
+                fallback_reason = f"e-mail body from {decision.model} before all tools ran"
+                continue
+            if small and not validate_body(email_body):
+                fallback_reason = f"invalid e-mail body from {decision.model}"
+                continue
+            break
+
+        fn_call = msg.function_call
+        fn_name = fn_call.name
+        try:
+            args = json.loads(fn_call.arguments or "{}")
+        except json.JSONDecodeError:
+            if not small:
+                raise
+            args = None
+        if small:
+            problem = _argument_error(fn_name, args)
+            if problem:
+                fallback_reason = f"{problem} from {decision.model}"
+                continue
+        try:
+            payload = run_tool(fn_name, args)
+        except Exception as e:
+            if not small:
+                raise
+            fallback_reason = f"{fn_name} failed on arguments from {decision.model}: {e}"
+            continue
         # add function result
         messages.append(msg.model_dump())
         messages.append({"role": "function", "name": fn_name, "content": json.dumps(payload)})
 
+    logger.info("Routing: %d model turns, est. cost $%.4f",
+                sum(d.model is not None for d in router.decisions), router.spent_usd)
     logger.info("Briefing completed; email body follows:\n%s", email_body)
     # output the briefing and send via SMTP
     print(email_body)
     subject = f"Executive Daily Briefing for {today_iso}"
-    send_email(subject, email_body)
+    html, text = finalize(email_body, payloads, today_iso)
+    logger.info("Post-processed e-mail: html %s bytes, text %s bytes",
+                len(html.encode()) if html else 0, len(text.encode()))
+    send_email(subject, html, text=text)
     logger.info("Email sent to %s", os.getenv("RECIPIENT"))
 
 
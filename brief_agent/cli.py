@@ -0,0 +1,208 @@
+"""
+Command-line interface for the briefing agent.
+
+Usage:
+    python -m brief_agent run [--profile]      # one briefing run (LLM + e-mail)
+    python -m brief_agent schedule [--at 06:30]
+    python -m brief_agent fetch <tool> [--date YYYY-MM-DD] [--profile]
+    python -m brief_agent render [--date YYYY-MM-DD] [--profile]
+    python -m brief_agent bench [--repeat N] [--tools]
+
+Running without a subcommand starts the scheduler, as before.
+`--profile` writes sampled-stack, allocation and cProfile reports to LOG_DIR
+(see brief_agent.utils.profiling).
+
+Only the standard library is imported at module load. Each command imports
+the modules it needs (openai, requests, msal, ...) when it runs, so cron and
+serverless invocations do not pay for dependencies they never use.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import subprocess
+import sys
+import time
+from contextlib import nullcontext
+from typing import List, Optional
+
+# modules timed by `bench`; heavy third-party imports first
+BENCH_MODULES = (
+    "openai",
+    "requests",
+    "msal",
+    "dotenv",
+    "brief_agent.cli",
+    "brief_agent.agent_runner",
+    "brief_agent.tools.news",
+    "brief_agent.tools.calendar_ms",
+    "brief_agent.tools.weather",
+    "brief_agent.tools.market",
+)
+
+_PROFILE_HELP = "write CPU/allocation profile reports to LOG_DIR"
+
+
+def _cmd_run(args: argparse.Namespace) -> int:
+    from brief_agent.agent_runner import run_briefing
+    run_briefing(profile=args.profile)
+    return 0
+
+
+def _cmd_schedule(args: argparse.Namespace) -> int:
+    from brief_agent.utils.scheduler import start
+    start(at=args.at)
+    return 0
+
+
+def _profiled(args: argparse.Namespace):
+    """Profile the command when --profile was given."""
+    if not args.profile:
+        return nullcontext()
+    from brief_agent.utils.profiling import profiled
+    return profiled(args.command, deterministic=True)
+
+
+def _cmd_fetch(args: argparse.Namespace) -> int:
+    from brief_agent.config import load_env
+
+    # .env must be loaded before modules that read settings at import
+    load_env()
+    from brief_agent.agent_runner import call_tool
+
+    fn_name = args.tool if args.tool.startswith("get_") else f"get_{args.tool}"
+    fn_args: dict = {}
+    if fn_name != "get_financials":
+        fn_args["iso_date"] = args.date
+    if fn_name == "get_headlines":
+        if args.query:
+            fn_args["query"] = args.query
+        if args.page_size:
+            fn_args["page_size"] = args.page_size
+    if fn_name == "get_weather" and args.location:
+        fn_args["location"] = args.location
+    if fn_name == "get_weather" and args.locations:
+        fn_args["locations"] = [loc.strip() for loc in args.locations.split(",") if loc.strip()]
+    with _profiled(args):
+        payload = call_tool(fn_name, fn_args)
+    print(json.dumps(payload, indent=2))
+    return 0
+
+
+def _cmd_render(args: argparse.Namespace) -> int:
+    from brief_agent.config import load_env
+
+    # .env must be loaded before modules that read settings at import
+    load_env()
+    from brief_agent.schema import Briefing
+    from brief_agent.tools.news import get_headlines
+    from brief_agent.tools.calendar_ms import get_meetings
+    from brief_agent.tools.weather import get_weather
+    from brief_agent.tools.market import get_financials
+    from brief_agent.utils.formatter import build_email_body
+
+    with _profiled(args):
+        aud_usd, nasdaq_close = get_financials()
+        briefing = Briefing(
+            date=datetime.date.fromisoformat(args.date),
+            headlines=get_headlines(args.date),
+            meetings=get_meetings(args.date),
+            weather=get_weather(args.date),
+            aud_usd=aud_usd,
+            nasdaq_close=nasdaq_close,
+        )
+        body = build_email_body(briefing)
+    print(body)
+    return 0
+
+
+def _import_time_ms(module: str) -> Optional[float]:
+    """Cold import time of `module` in a fresh interpreter, or None if it fails."""
+    code = (
+        "import time; t = time.perf_counter(); "
+        f"import {module}; "
+        "print((time.perf_counter() - t) * 1000)"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        return None
+    return float(proc.stdout.strip())
+
+
+def _cmd_bench(args: argparse.Namespace) -> int:
+    print(f"{'module':32} {'import ms (best of %d)' % args.repeat:>24}")
+    for module in BENCH_MODULES:
+        samples = [_import_time_ms(module) for _ in range(args.repeat)]
+        ok = [s for s in samples if s is not None]
+        shown = f"{min(ok):.1f}" if ok else "unavailable"
+        print(f"{module:32} {shown:>24}")
+
+    if args.tools:
+        from brief_agent.config import load_env
+
+        load_env()
+        from brief_agent.agent_runner import TOOL_NAMES, call_tool
+
+        iso_date = datetime.date.today().isoformat()
+        print()
+        print(f"{'tool':32} {'call ms':>24}")
+        for fn_name in TOOL_NAMES:
+            fn_args = {} if fn_name == "get_financials" else {"iso_date": iso_date}
+            t = time.perf_counter()
+            try:
+                call_tool(fn_name, fn_args)
+                shown = f"{(time.perf_counter() - t) * 1000:.1f}"
+            except Exception as e:
+                shown = f"error: {e}"
+            print(f"{fn_name:32} {shown:>24}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    today = datetime.date.today().isoformat()
+    parser = argparse.ArgumentParser(
+        prog="brief_agent", description="Executive Daily Briefing agent"
+    )
+    sub = parser.add_subparsers(dest="command")
+
+    p = sub.add_parser("run", help="run one briefing and send the e-mail")
+    p.add_argument("--profile", action="store_true", help=_PROFILE_HELP)
+    p.set_defaults(func=_cmd_run)
+
+    p = sub.add_parser("schedule", help="run the briefing every day in-process")
+    p.add_argument("--at", default="06:30", help="local time of day, HH:MM")
+    p.set_defaults(func=_cmd_schedule)
+
+    p = sub.add_parser("fetch", help="call a single tool and print its JSON payload")
+    p.add_argument("tool", choices=["headlines", "meetings", "weather", "financials"])
+    p.add_argument("--date", default=today, help="ISO date (default: today)")
+    p.add_argument("--query", help="headline search query")
+    p.add_argument("--page-size", type=int, help="number of headlines")
+    p.add_argument("--location", help="weather location (default: $LOCATION)")
+    p.add_argument("--locations", help="extra weather locations, comma-separated (bulk request)")
+    p.add_argument("--profile", action="store_true", help=_PROFILE_HELP)
+    p.set_defaults(func=_cmd_fetch)
+
+    p = sub.add_parser("render", help="build a plain-text briefing without the LLM")
+    p.add_argument("--date", default=today, help="ISO date (default: today)")
+    p.add_argument("--profile", action="store_true", help=_PROFILE_HELP)
+    p.set_defaults(func=_cmd_render)
+
+    p = sub.add_parser("bench", help="measure cold import and tool latency")
+    p.add_argument("--repeat", type=int, default=3, help="import samples per module")
+    p.add_argument("--tools", action="store_true", help="also time each tool call")
+    p.set_defaults(func=_cmd_bench)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        args = parser.parse_args(["schedule"])
+    return args.func(args)
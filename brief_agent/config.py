@@ -10,6 +10,10 @@ so the rest of the code can do `c = cfg()` and access:
 
 If either `AZURE_CLIENT_ID` or `AZURE_TENANT_ID` is missing, cfg() raises
 RuntimeError so callers fail fast.
+
+`load_env()` loads a local `.env` on demand; it is called by the commands
+that need secrets rather than at import time, so `python -m brief_agent`
+starts without importing python-dotenv.
 """
 
 from __future__ import annotations
@@ -17,6 +21,18 @@ from __future__ import annotations
 import os
 from typing import Dict
 
+_ENV_LOADED = False
+
+
+def load_env() -> None:
+    """Load `.env` into the process environment (once per process)."""
+    global _ENV_LOADED
+    if _ENV_LOADED:
+        return
+    from dotenv import load_dotenv
+    load_dotenv()
+    _ENV_LOADED = True
+
 
 def cfg() -> Dict[str, str]:
     client_id = os.getenv("AZURE_CLIENT_ID")
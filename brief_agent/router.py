@@ -0,0 +1,129 @@
+"""
+Budget-aware model routing for the briefing loop.
+
+Turns are classified by what the model still has to do:
+
+    tool_selection  some tools in TOOL_NAMES have not been called yet
+    synthesis       all data is present; the model writes the e-mail
+
+Tool selection for a briefing is deterministic (every tool, for today), so by
+default the runner executes that plan itself and the tool-selection turns are
+skipped entirely (ROUTE_PREFETCH_TOOLS=0 sends them to the small model
+instead; a small-model turn calling an unknown tool, with arguments that do
+not match its schema or that make the tool fail, or with a premature e-mail
+is retried on the large model). Synthesis goes to the large
+model unless the remaining per-run latency or cost budget cannot cover it, in
+which case the small model is used; a small-model e-mail that fails
+validation is regenerated with the large model. Every decision is logged to
+the run log.
+
+SMALL_MODEL, ROUTE_PREFETCH_TOOLS, RUN_LATENCY_BUDGET_S, RUN_COST_BUDGET_USD
+and LARGE_TURN_S are read when a Router is built, so values from .env apply.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# expected output size of a large-model synthesis turn
+SYNTHESIS_COMPLETION_TOKENS = 1500
+
+# USD per 1K (prompt, completion) tokens; unknown models are priced as gpt-4
+PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4-0613": (0.03, 0.06),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4o-mini": (0.00015, 0.0006),
+}
+
+TOOL_SELECTION = "tool_selection"
+SYNTHESIS = "synthesis"
+
+
+def cost_usd(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prompt_price, completion_price = PRICES.get(model, PRICES["gpt-4-0613"])
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+
+
+def estimate_tokens(messages: List[dict]) -> int:
+    """Rough prompt size: ~4 characters per token."""
+    return len(json.dumps(messages, ensure_ascii=False)) // 4
+
+
+def _env_float(name: str, default: str):
+    return field(default_factory=lambda: float(os.getenv(name, default)))
+
+
+def validate_body(body: Optional[str]) -> bool:
+    """A usable e-mail body is non-empty HTML with headings."""
+    if not body or not body.strip():
+        return False
+    lowered = body.lower()
+    return "<h1" in lowered or "<h2" in lowered
+
+
+@dataclass
+class Decision:
+    phase: str
+    model: Optional[str]  # None: turn skipped
+    reason: str
+
+
+@dataclass
+class Router:
+    large_model: str
+    small_model: str = field(default_factory=lambda: os.getenv("SMALL_MODEL", "gpt-4o-mini"))
+    latency_budget_s: float = _env_float("RUN_LATENCY_BUDGET_S", "120")
+    cost_budget_usd: float = _env_float("RUN_COST_BUDGET_USD", "0.25")
+    prefetch_tools: bool = field(default_factory=lambda: os.getenv("ROUTE_PREFETCH_TOOLS", "1") != "0")
+    # expected wall time of a large-model synthesis turn
+    large_turn_s: float = _env_float("LARGE_TURN_S", "40")
+    logger: logging.Logger = field(default_factory=lambda: logging.getLogger("briefing"))
+    started: float = field(default_factory=time.monotonic)
+    spent_usd: float = 0.0
+    decisions: List[Decision] = field(default_factory=list)
+
+    def _record(self, decision: Decision) -> Decision:
+        self.decisions.append(decision)
+        self.logger.info("Routing %s turn -> %s (%s)", decision.phase,
+                         decision.model or "skipped", decision.reason)
+        return decision
+
+    def plan_tools(self, today_iso: str, tool_names) -> List[Tuple[str, dict]]:
+        """
+        The deterministic tool calls run in place of tool-selection turns.
+        The runner adds get_weather's `meeting_times` from the get_meetings
+        result; get_headlines gets no `query`, so its topic is the configured
+        one (news.topic_query: NEWS_RECIPIENT_QUERIES, then NEWS_QUERY).
+        """
+        if not self.prefetch_tools:
+            return []
+        self._record(Decision(TOOL_SELECTION, None, "deterministic plan: " + ", ".join(tool_names)))
+        return [(name, {} if name == "get_financials" else {"iso_date": today_iso})
+                for name in tool_names]
+
+    def choose(self, phase: str, messages: List[dict]) -> Decision:
+        if phase == TOOL_SELECTION:
+            return self._record(Decision(phase, self.small_model, "tool selection"))
+        remaining_s = self.latency_budget_s - (time.monotonic() - self.started)
+        remaining_usd = self.cost_budget_usd - self.spent_usd
+        estimate = cost_usd(self.large_model, estimate_tokens(messages), SYNTHESIS_COMPLETION_TOKENS)
+        if estimate > remaining_usd:
+            return self._record(Decision(
+                phase, self.small_model,
+                f"large model est ${estimate:.3f} > remaining ${remaining_usd:.3f}"))
+        if self.large_turn_s > remaining_s:
+            return self._record(Decision(
+                phase, self.small_model,
+                f"large model ~{self.large_turn_s:.0f}s > remaining {remaining_s:.0f}s"))
+        return self._record(Decision(phase, self.large_model, "within budget"))
+
+    def fallback(self, phase: str, reason: str) -> Decision:
+        return self._record(Decision(phase, self.large_model, f"fallback: {reason}"))
+
+    def charge(self, model: str, prompt_tokens: int, completion_tokens: int) -> None:
+        self.spent_usd += cost_usd(model, prompt_tokens, completion_tokens)
@@ -1,17 +1,22 @@
 from dataclasses import dataclass
 from datetime import date, datetime
-from typing import List
+from typing import List, Optional
 
 @dataclass
 class Headline:
     title: str
     url: str
+    source: str = ""
+    published: Optional[datetime] = None
 
 @dataclass
 class Meeting:
     start: datetime
     end: datetime
     summary: str
+    location: str = ""
+    all_day: bool = False
+    show_as: str = "busy"  # Graph showAs: free, tentative, busy, oof, ...
 
 @dataclass
 class Weather:
@@ -19,6 +24,12 @@ class Weather:
     max_c: float
     rain_chance_pct: int
 
+@dataclass
+class HourlyWeather:
+    time: datetime
+    temp_c: float
+    rain_chance_pct: int
+
 @dataclass
 class Briefing:
     date: date
@@ -1,15 +1,22 @@
-from datetime import datetime as dt
+from datetime import datetime as dt, time, timedelta, timezone
 import requests
 import os
-# MSAL may not be installed in all environments; import safely
-try:
-    import msal
-    _TOKEN_CACHE = msal.SerializableTokenCache()
-except ImportError:
-    msal = None  # type: ignore
-    _TOKEN_CACHE = None  # type: ignore
 from brief_agent.schema import Meeting
 from brief_agent.config import cfg
+from brief_agent.utils.analytics import local_tz
+
+# MSAL is imported on first token request: it is slow to import and may not
+# be installed in all environments.
+_TOKEN_CACHE = None
+
+
+def _msal():
+    """Import msal lazily and create the shared in-process token cache."""
+    global _TOKEN_CACHE
+    import msal
+    if _TOKEN_CACHE is None:
+        _TOKEN_CACHE = msal.SerializableTokenCache()
+    return msal
 
 # expected cfg() keys for confidential flow:
 # AZURE_CLIENT_ID, AZURE_CLIENT_SECRET, AZURE_TENANT_ID
@@ -23,6 +30,7 @@ def _acquire_token() -> str:
     2) Device‑code flow (interactive) as fallback
     """
     c = cfg()
+    msal = _msal()
 
     # --- confidential‑client flow ----------------------------
     if "AZURE_CLIENT_SECRET" in c:
@@ -58,9 +66,23 @@ def _acquire_token() -> str:
         return result["access_token"]
     raise RuntimeError(result.get("error_description", "Failed to acquire access token"))
 
+def _utc_window(iso_date: str) -> tuple[str, str]:
+    """
+    Graph calendarView bounds (UTC) covering the local day `iso_date`, from
+    local midnight to the next local midnight.
+    """
+    day = dt.fromisoformat(iso_date).date()
+    tz = local_tz()
+    bounds = (dt.combine(day, time(0), tz), dt.combine(day + timedelta(days=1), time(0), tz))
+    start, end = (b.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ") for b in bounds)
+    return start, end
+
+
 def get_meetings(iso_date: str) -> list[Meeting]:
     """
-    Fetch calendar events for the given date via Microsoft Graph (UTC).
+    Fetch calendar events for the given local date via Microsoft Graph.
+    Event times come back as naive UTC datetimes. Cancelled events are
+    skipped; all-day and "free" events are flagged (see analytics).
     Uses confidential‑client token if available, otherwise falls back to device flow.
     """
     # Stub or safe‑fail calendar lookup to avoid breaking local/CI runs
@@ -71,8 +93,7 @@ def get_meetings(iso_date: str) -> list[Meeting]:
 
         # real calendar fetch via MS Graph
         token = _acquire_token()
-        start = f"{iso_date}T00:00:00Z"
-        end = f"{iso_date}T23:59:59Z"
+        start, end = _utc_window(iso_date)
         url = (
             "https://graph.microsoft.com/v1.0/me/calendarView"
             f"?startDateTime={start}&endDateTime={end}"
@@ -86,10 +107,16 @@ def get_meetings(iso_date: str) -> list[Meeting]:
         events = resp.json().get("value", [])
         meetings: list[Meeting] = []
         for ev in events:
+            if ev.get("isCancelled"):
+                continue
             s = dt.fromisoformat(ev["start"]["dateTime"])
             e = dt.fromisoformat(ev["end"]["dateTime"])
             summary = ev.get("subject") or "(no title)"
-            meetings.append(Meeting(start=s, end=e, summary=summary))
+            location = (ev.get("location") or {}).get("displayName") or ""
+            meetings.append(Meeting(
+                start=s, end=e, summary=summary, location=location,
+                all_day=bool(ev.get("isAllDay")), show_as=ev.get("showAs") or "busy",
+            ))
         return meetings
     except Exception:
         # On any error (auth, HTTP, parsing), return empty list
@@ -1,69 +1,216 @@
+"""
+Headline sources.
+
+Each source is a function `(query, limit) -> list[Headline]` registered
+under a name with `@register_source`. `get_headlines` fetches the sources
+named in NEWS_SOURCES concurrently, waits at most NEWS_DEADLINE seconds for
+the whole set, then merges and de-duplicates the results, so adding a
+source does not add serial latency.
+
+Built-in sources:
+    google_au, google_us   Google News RSS search, AU and US editions
+    newsapi                NewsAPI /v2/everything (needs NEWSAPI_KEY)
+    feeds                  any RSS/Atom URLs listed in NEWS_FEEDS (comma-separated)
+
+The topic query is, in order: the `query` argument, the recipient's entry in
+NEWS_RECIPIENT_QUERIES (a JSON object mapping e-mail address to query; the
+recipient defaults to RECIPIENT), NEWS_QUERY, then DEFAULT_QUERY.
+"""
+
+import json
+import os
 import requests
 import xml.etree.ElementTree as ET
-from datetime import datetime, date
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, date, timezone
 from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+from urllib.parse import quote_plus, urlparse
 from brief_agent.schema import Headline
 
-def get_headlines(iso_date: str, query: str = None, page_size: int = 7) -> list[Headline]:
+DEFAULT_QUERY = '"generative ai" OR "quantum computing" OR robotics'
+DEFAULT_SOURCES = "google_au,google_us,newsapi,feeds"
+DEADLINE_SECONDS = float(os.getenv("NEWS_DEADLINE", "8"))
+REQUEST_TIMEOUT = 10
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+
+SourceFn = Callable[[str, int], list[Headline]]
+SOURCES: dict[str, SourceFn] = {}
+
+
+def register_source(name: str) -> Callable[[SourceFn], SourceFn]:
+    """Decorator adding a headline source to the registry."""
+    def decorator(fn: SourceFn) -> SourceFn:
+        SOURCES[name] = fn
+        return fn
+    return decorator
+
+
+def _parse_date(text: Optional[str]) -> Optional[datetime]:
+    if not text:
+        return None
+    try:
+        return parsedate_to_datetime(text)
+    except Exception:
+        pass
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except Exception:
+        return None
+
+
+def parse_feed(content: bytes, source: str) -> list[Headline]:
+    """Parse an RSS 2.0 or Atom document into headlines."""
+    root = ET.fromstring(content)
+    headlines: list[Headline] = []
+    for item in root.iter("item"):
+        title = item.findtext("title", default="")
+        link = item.findtext("link", default="")
+        if title and link:
+            headlines.append(Headline(
+                title=title,
+                url=link,
+                source=item.findtext("source") or source,
+                published=_parse_date(item.findtext("pubDate")),
+            ))
+    for entry in root.iter(f"{_ATOM}entry"):
+        title = entry.findtext(f"{_ATOM}title", default="")
+        link_elem = entry.find(f"{_ATOM}link")
+        link = link_elem.get("href", "") if link_elem is not None else ""
+        if title and link:
+            published = entry.findtext(f"{_ATOM}published") or entry.findtext(f"{_ATOM}updated")
+            headlines.append(Headline(
+                title=title,
+                url=link,
+                source=source,
+                published=_parse_date(published),
+            ))
+    return headlines
+
+
+def _fetch_feed(url: str, source: str) -> list[Headline]:
+    resp = requests.get(url, timeout=REQUEST_TIMEOUT)
+    resp.raise_for_status()
+    return parse_feed(resp.content, source)
+
+
+def _google_news(query: str, edition: str) -> list[Headline]:
+    # past 24 h for the given edition, e.g. "AU"
+    url = (
+        f"https://news.google.com/rss/search?q={quote_plus(query + ' when:1d')}"
+        f"&hl=en-{edition}&gl={edition}&ceid={edition}:en"
+    )
+    return _fetch_feed(url, f"Google News {edition}")
+
+
+@register_source("google_au")
+def _google_au(query: str, limit: int) -> list[Headline]:
+    return _google_news(query, "AU")[:limit]
+
+
+@register_source("google_us")
+def _google_us(query: str, limit: int) -> list[Headline]:
+    return _google_news(query, "US")[:limit]
+
+
+@register_source("newsapi")
+def _newsapi(query: str, limit: int) -> list[Headline]:
+    key = os.getenv("NEWSAPI_KEY")
+    if not key:
+        return []
+    resp = requests.get(
+        "https://newsapi.org/v2/everything",
+        params={"q": query, "pageSize": limit, "sortBy": "publishedAt", "language": "en", "apiKey": key},
+        timeout=REQUEST_TIMEOUT,
+    )
+    resp.raise_for_status()
+    return [
+        Headline(
+            title=a.get("title") or "",
+            url=a.get("url") or "",
+            source=(a.get("source") or {}).get("name") or "NewsAPI",
+            published=_parse_date(a.get("publishedAt")),
+        )
+        for a in resp.json().get("articles", [])
+        if a.get("title") and a.get("url")
+    ]
+
+
+def _jobs(names: list[str]) -> list[tuple[str, SourceFn]]:
+    """Resolve source names to fetch jobs; "feeds" expands to one job per NEWS_FEEDS URL."""
+    jobs: list[tuple[str, SourceFn]] = []
+    for name in names:
+        if name == "feeds":
+            for url in filter(None, (u.strip() for u in os.getenv("NEWS_FEEDS", "").split(","))):
+                jobs.append((url, lambda q, n, url=url: _fetch_feed(url, urlparse(url).netloc)[:n]))
+        elif name in SOURCES:
+            jobs.append((name, SOURCES[name]))
+    return jobs
+
+
+def _merge(results: list[list[Headline]], iso_date: str, limit: int) -> list[Headline]:
     """
-    Fetch the top 5 generative AI, quantum computing, and robotics news headlines for the given date
-    by scraping Google News RSS feeds. Returns a list of Headline(title, url).
+    De-duplicate by URL and title, round-robin across sources so no single
+    feed dominates, and rank items published on `iso_date` first.
+    """
+    seen: set[str] = set()
+    merged: list[Headline] = []
+    for rank in range(max((len(r) for r in results), default=0)):
+        for r in results:
+            if rank < len(r):
+                h = r[rank]
+                keys = {h.url, h.title.strip().lower()}
+                if keys & seen:
+                    continue
+                seen |= keys
+                merged.append(h)
+
+    def on_date(h: Headline) -> bool:
+        if h.published is None:
+            return False
+        pub = h.published if h.published.tzinfo else h.published.replace(tzinfo=timezone.utc)
+        return pub.date().isoformat() == iso_date
+
+    merged.sort(key=lambda h: not on_date(h))  # stable: keeps round-robin order
+    return merged[:limit]
+
+
+def topic_query(recipient: Optional[str] = None) -> str:
+    """Configured topic query for `recipient` (default: RECIPIENT)."""
+    recipient = (recipient or os.getenv("RECIPIENT") or "").strip().lower()
+    try:
+        per_recipient = json.loads(os.getenv("NEWS_RECIPIENT_QUERIES") or "{}")
+    except ValueError:
+        per_recipient = {}
+    by_address = {k.strip().lower(): v for k, v in per_recipient.items()}
+    return by_address.get(recipient) or os.getenv("NEWS_QUERY") or DEFAULT_QUERY
+
+
+def get_headlines(iso_date: str, query: str = None, page_size: int = 7,
+                  recipient: str = None) -> list[Headline]:
+    """
+    Fetch the top generative AI, quantum computing, and robotics news headlines for the given date
+    from every configured source concurrently. `query` overrides the recipient's configured topic
+    search (see topic_query). Returns a list of Headline(title, url, source, published).
     """
     # Validate date format
     _ = date.fromisoformat(iso_date)
-    # RSS feed URLs for business and technology
-    feeds = [
-        # Australia view, past 24 h
-        'https://news.google.com/rss/search?q="generative+ai"+OR+"quantum+computing"+OR+robotics+when:1d&hl=en-AU&gl=AU&ceid=AU:en',
-        # United States view, past 24 h
-        'https://news.google.com/rss/search?q="generative+ai"+OR+"quantum+computing"+OR+robotics+when:1d&hl=en-US&gl=US&ceid=US:en'
-    ]
-    headlines: list[Headline] = []
-    # Determine how many headlines to fetch
     limit = page_size or 7
-    # Attempt to collect from business first, then technology
-    for feed in feeds:
-        try:
-            resp = requests.get(feed, timeout=10)
-            resp.raise_for_status()
-            root = ET.fromstring(resp.content)
-            items = root.findall('.//item')
-            for item in items:
-                if len(headlines) >= limit:
-                    break
-                title_elem = item.find('title')
-                link_elem = item.find('link')
-                date_elem = item.find('pubDate')
-                if title_elem is None or link_elem is None or date_elem is None:
-                    continue
-                try:
-                    pub = parsedate_to_datetime(date_elem.text)
-                    if pub.date().isoformat() != iso_date:
-                        continue
-                except Exception:
-                    pass
-                headlines.append(Headline(title=title_elem.text or "", url=link_elem.text or ""))
-        except Exception:
-            continue
-        if len(headlines) >= 3:
-            break
-    # If less than limit, fill remaining from earliest items
-    if len(headlines) < limit:
-        for feed in feeds:
-            try:
-                resp = requests.get(feed, timeout=10)
-                resp.raise_for_status()
-                root = ET.fromstring(resp.content)
-                items = root.findall('.//item')
-                for item in items:
-                    if len(headlines) >= limit:
-                        break
-                    title = item.findtext('title', default="")
-                    link = item.findtext('link', default="")
-                    if title and link and not any(h.url == link for h in headlines):
-                        headlines.append(Headline(title=title, url=link))
-            except Exception:
-                continue
-            if len(headlines) >= 3:
-                break
-    return headlines
\ No newline at end of file
+    query = query or topic_query(recipient)
+    names = [n.strip() for n in os.getenv("NEWS_SOURCES", DEFAULT_SOURCES).split(",") if n.strip()]
+    jobs = _jobs(names)
+    if not jobs:
+        return []
+
+    pool = ThreadPoolExecutor(max_workers=len(jobs))
+    futures = [pool.submit(fn, query, limit) for _, fn in jobs]
+    done, _ = wait(futures, timeout=DEADLINE_SECONDS)
+    # don't block on stragglers past the deadline
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    results: list[list[Headline]] = []
+    for f in futures:
+        if f in done and f.exception() is None:
+            results.append(f.result())
+    return _merge(results, iso_date, limit)
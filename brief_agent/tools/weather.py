@@ -1,35 +1,163 @@
 import os
+import time
 import requests
-from datetime import date
-from brief_agent.schema import Weather
+from datetime import date, datetime, time as dtime
+from brief_agent.schema import HourlyWeather, Weather
+from brief_agent.utils import metrics
 
-def get_weather(iso_date: str) -> Weather:
-    """
-    Fetch weather forecast for the given ISO date using WeatherAPI.com.
-    Requires WEATHER_API_KEY and optional LOCATION in .env (default: Melbourne).
-    """
-    # Validate date
-    _ = date.fromisoformat(iso_date)
+FORECAST_URL = "http://api.weatherapi.com/v1/forecast.json"
+# One request covers this many days; later-date lookups are served from cache.
+FORECAST_DAYS = int(os.getenv("WEATHER_FORECAST_DAYS", "3"))
+CACHE_TTL_SECONDS = int(os.getenv("WEATHER_CACHE_TTL", "3600"))
 
+# (location, iso_date) -> (fetched_at, WeatherAPI "forecastday" dict incl. hourly data)
+_FORECAST_CACHE: dict[tuple[str, str], tuple[float, dict]] = {}
+
+
+def _api_key() -> str:
     api_key = os.getenv("WEATHER_API_KEY")
     if not api_key:
         raise RuntimeError("WEATHER_API_KEY not set in environment")
+    return api_key
+
 
+def default_location() -> str:
     # Location can be city name or "lat,lon" string
-    location = os.getenv("LOCATION", "Melbourne")
+    return os.getenv("LOCATION", "Melbourne")
+
+
+def _store(location: str, forecast: dict) -> None:
+    now = time.monotonic()
+    for day in forecast.get("forecastday", []):
+        if "date" in day:
+            _FORECAST_CACHE[(location, day["date"])] = (now, day)
+
+
+def _cached(location: str, iso_date: str) -> dict | None:
+    entry = _FORECAST_CACHE.get((location, iso_date))
+    if entry is None or time.monotonic() - entry[0] > CACHE_TTL_SECONDS:
+        return None
+    return entry[1]
+
+
+def _fetch_forecast(location: str) -> None:
     params = {
-        "key": api_key,
+        "key": _api_key(),
         "q": location,
-        "days": 1,
+        "days": FORECAST_DAYS,
         "aqi": "no",
         "alerts": "no"
     }
-    resp = requests.get("http://api.weatherapi.com/v1/forecast.json", params=params)
+    resp = requests.get(FORECAST_URL, params=params)
     resp.raise_for_status()
-    data = resp.json()
-    day = data.get("forecast", {}).get("forecastday", [])[0].get("day", {})
+    _store(location, resp.json().get("forecast", {}))
+
+
+def _fetch_bulk(locations: list[str]) -> None:
+    """
+    Fetch forecasts for several locations in one WeatherAPI bulk request
+    (q=bulk). Falls back to one request per location if bulk is unavailable
+    on the account's plan; locations that still fail are left uncached.
+    """
+    body = {"locations": [{"q": loc, "custom_id": str(i)} for i, loc in enumerate(locations)]}
+    params = {"key": _api_key(), "q": "bulk", "days": FORECAST_DAYS, "aqi": "no", "alerts": "no"}
+    try:
+        resp = requests.post(FORECAST_URL, params=params, json=body)
+        resp.raise_for_status()
+        for entry in resp.json().get("bulk", []):
+            query = entry.get("query", {})
+            idx = int(query.get("custom_id", -1))
+            if 0 <= idx < len(locations):
+                _store(locations[idx], query.get("forecast", {}))
+    except Exception:
+        for loc in locations:
+            try:
+                _fetch_forecast(loc)
+            except Exception:
+                continue
+
+
+def _forecast_day(iso_date: str, location: str) -> dict:
+    day = _cached(location, iso_date)
+    metrics.CACHE_REQUESTS.inc(cache="weather", result="miss" if day is None else "hit")
+    if day is None:
+        _fetch_forecast(location)
+        day = _cached(location, iso_date)
+    if day is None:
+        raise RuntimeError(f"No forecast for {location} on {iso_date}")
+    return day
+
+
+def _to_weather(day: dict) -> Weather:
+    summary = day.get("day", {})
     return Weather(
-        min_c=day.get("mintemp_c", 0.0),
-        max_c=day.get("maxtemp_c", 0.0),
-        rain_chance_pct=day.get("daily_chance_of_rain", 0)
-    )
\ No newline at end of file
+        min_c=summary.get("mintemp_c", 0.0),
+        max_c=summary.get("maxtemp_c", 0.0),
+        rain_chance_pct=summary.get("daily_chance_of_rain", 0)
+    )
+
+
+def get_weather(iso_date: str, location: str = None) -> Weather:
+    """
+    Fetch weather forecast for the given ISO date using WeatherAPI.com.
+    Requires WEATHER_API_KEY and optional LOCATION in .env (default: Melbourne).
+    A multi-day forecast is requested once and cached per (location, date).
+    """
+    # Validate date
+    _ = date.fromisoformat(iso_date)
+    return _to_weather(_forecast_day(iso_date, location or default_location()))
+
+
+def get_weather_bulk(iso_date: str, locations: list[str]) -> dict[str, Weather]:
+    """
+    Forecast for several locations on the given date, fetching every
+    location not already cached in a single bulk request. Best effort:
+    locations without a forecast are left out of the result.
+    """
+    _ = date.fromisoformat(iso_date)
+    missing = [loc for loc in locations if _cached(loc, iso_date) is None]
+    for loc in locations:
+        metrics.CACHE_REQUESTS.inc(cache="weather", result="miss" if loc in missing else "hit")
+    if missing:
+        _fetch_bulk(missing)
+    # read the cache directly: lookups are counted above, and locations the
+    # bulk request (or its per-location fallback) could not fetch are dropped
+    result = {}
+    for loc in locations:
+        day = _cached(loc, iso_date)
+        if day is not None:
+            result[loc] = _to_weather(day)
+    return result
+
+
+def get_hourly(iso_date: str, location: str = None) -> list[HourlyWeather]:
+    """Hourly forecast for the date, served from the cached forecast."""
+    _ = date.fromisoformat(iso_date)
+    day = _forecast_day(iso_date, location or default_location())
+    return [
+        HourlyWeather(
+            time=datetime.strptime(h["time"], "%Y-%m-%d %H:%M"),
+            temp_c=h.get("temp_c", 0.0),
+            rain_chance_pct=h.get("chance_of_rain", 0),
+        )
+        for h in day.get("hour", [])
+    ]
+
+
+def umbrella_times(iso_date: str, times: list[str], location: str = None,
+                   threshold_pct: int = 50) -> list[str]:
+    """
+    Return those of the given "HH:MM" times (e.g. meeting starts, in the
+    location's local time) whose hour has a rain chance of at least
+    `threshold_pct`. Entries that are not HH:MM times are skipped.
+    """
+    by_hour = {h.time.hour: h.rain_chance_pct for h in get_hourly(iso_date, location)}
+    wet = []
+    for t in times:
+        try:
+            hour = dtime.fromisoformat(str(t).strip()).hour
+        except ValueError:
+            continue
+        if by_hour.get(hour, 0) >= threshold_pct:
+            wet.append(t)
+    return wet
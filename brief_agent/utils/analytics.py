@@ -0,0 +1,211 @@
+"""
+Interval analytics over calendar `Meeting` objects.
+
+Graph returns meeting times in UTC (naive datetimes); everything here works
+on timezone-aware local times (`BRIEFING_TZ`, default Australia/Melbourne,
+i.e. AEST/AEDT) so the briefing can quote HH:MM directly.
+
+All functions sort once and sweep, so they run in O(n log n) (plus the
+number of conflicting pairs reported by `find_conflicts`). All-day events
+and events shown as "free" are not busy time: they are listed but left out
+of conflicts, busy runs, free blocks and transitions.
+`summarize()` packs the results into a small JSON-ready dict that is handed
+to the LLM instead of the raw meeting list.
+"""
+
+from __future__ import annotations
+
+import heapq
+import os
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from typing import List, Optional
+
+from brief_agent.schema import Meeting
+
+WORKDAY_START = os.getenv("WORKDAY_START", "09:00")
+WORKDAY_END = os.getenv("WORKDAY_END", "17:00")
+# minimum free block that counts as focus time
+FOCUS_MINUTES = int(os.getenv("FOCUS_MINUTES", "60"))
+# gap needed between meetings held at different physical locations
+TRAVEL_MINUTES = int(os.getenv("TRAVEL_MINUTES", "30"))
+
+_ONLINE_HINTS = ("teams", "zoom", "online", "webex", "meet.google")
+
+
+def local_tz() -> tzinfo:
+    """Briefing timezone; falls back to fixed AEST (UTC+10) without tz data."""
+    try:
+        from zoneinfo import ZoneInfo
+        return ZoneInfo(os.getenv("BRIEFING_TZ", "Australia/Melbourne"))
+    except Exception:
+        return timezone(timedelta(hours=10), "AEST")
+
+
+def to_local(dt: datetime, tz: Optional[tzinfo] = None) -> datetime:
+    """Convert a datetime to local time; naive values are taken to be UTC."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(tz or local_tz())
+
+
+@dataclass
+class Conflict:
+    first: Meeting
+    second: Meeting
+    overlap_minutes: int
+
+
+@dataclass
+class Block:
+    start: datetime
+    end: datetime
+    meetings: List[Meeting] = field(default_factory=list)
+
+    @property
+    def minutes(self) -> int:
+        return int((self.end - self.start).total_seconds() // 60)
+
+
+@dataclass
+class Transition:
+    before: Meeting
+    after: Meeting
+    gap_minutes: int
+
+
+def _localized(meetings: List[Meeting], tz: tzinfo) -> List[Meeting]:
+    out = [replace(m, start=to_local(m.start, tz), end=to_local(m.end, tz)) for m in meetings]
+    out.sort(key=lambda m: (m.start, m.end))
+    return out
+
+
+def _busy(meetings: List[Meeting]) -> List[Meeting]:
+    """Meetings that block time: not all-day and not shown as free."""
+    return [m for m in meetings if not m.all_day and m.show_as != "free"]
+
+
+def _minutes(delta: timedelta) -> int:
+    return int(delta.total_seconds() // 60)
+
+
+def find_conflicts(meetings: List[Meeting]) -> List[Conflict]:
+    """Every pair of overlapping (double-booked) meetings."""
+    tz = local_tz()
+    active: list[tuple[datetime, int, Meeting]] = []  # min-heap by end time
+    conflicts: List[Conflict] = []
+    for i, m in enumerate(_localized(_busy(meetings), tz)):
+        while active and active[0][0] <= m.start:
+            heapq.heappop(active)
+        for end, _, other in active:
+            overlap = min(end, m.end) - m.start
+            conflicts.append(Conflict(first=other, second=m, overlap_minutes=_minutes(overlap)))
+        heapq.heappush(active, (m.end, i, m))
+    return conflicts
+
+
+def merge_runs(meetings: List[Meeting], max_gap_minutes: int = 0) -> List[Block]:
+    """
+    Merge overlapping and back-to-back meetings (gap <= `max_gap_minutes`)
+    into contiguous busy blocks.
+    """
+    gap = timedelta(minutes=max_gap_minutes)
+    blocks: List[Block] = []
+    for m in _localized(_busy(meetings), local_tz()):
+        if blocks and m.start <= blocks[-1].end + gap:
+            blocks[-1].end = max(blocks[-1].end, m.end)
+            blocks[-1].meetings.append(m)
+        else:
+            blocks.append(Block(start=m.start, end=m.end, meetings=[m]))
+    return blocks
+
+
+def free_blocks(meetings: List[Meeting], iso_date: str,
+                day_start: str = WORKDAY_START, day_end: str = WORKDAY_END,
+                min_minutes: int = 15) -> List[Block]:
+    """Free periods of at least `min_minutes` inside the local working day."""
+    tz = local_tz()
+    d = date.fromisoformat(iso_date)
+    cursor = datetime.combine(d, time.fromisoformat(day_start), tz)
+    close = datetime.combine(d, time.fromisoformat(day_end), tz)
+    free: List[Block] = []
+    for b in merge_runs(meetings):
+        if b.end <= cursor or b.start >= close:
+            continue
+        if _minutes(b.start - cursor) >= min_minutes:
+            free.append(Block(start=cursor, end=b.start))
+        cursor = max(cursor, b.end)
+    if _minutes(close - cursor) >= min_minutes:
+        free.append(Block(start=cursor, end=close))
+    return free
+
+
+def focus_time(meetings: List[Meeting], iso_date: str,
+               min_minutes: int = FOCUS_MINUTES) -> List[Block]:
+    """Free blocks long enough for focused work."""
+    return free_blocks(meetings, iso_date, min_minutes=min_minutes)
+
+
+def _in_person(m: Meeting) -> bool:
+    loc = (m.location or "").lower()
+    return bool(loc) and not any(hint in loc for hint in _ONLINE_HINTS)
+
+
+def tight_transitions(meetings: List[Meeting],
+                      travel_minutes: int = TRAVEL_MINUTES) -> List[Transition]:
+    """
+    Consecutive in-person meetings at different locations with less than
+    `travel_minutes` between them.
+    """
+    ordered = [m for m in _localized(_busy(meetings), local_tz()) if _in_person(m)]
+    tight: List[Transition] = []
+    for before, after in zip(ordered, ordered[1:]):
+        gap = _minutes(after.start - before.end)
+        if before.location.strip().lower() != after.location.strip().lower() and gap < travel_minutes:
+            tight.append(Transition(before=before, after=after, gap_minutes=gap))
+    return tight
+
+
+def _hhmm(dt: datetime) -> str:
+    return dt.strftime("%H:%M")
+
+
+def summarize(meetings: List[Meeting], iso_date: str) -> dict:
+    """
+    Precomputed schedule facts for the briefing prompt (local HH:MM times).
+    All-day events are listed by summary under "all_day"; "free" events
+    stay in "meetings", marked with "show_as".
+    """
+    tz = local_tz()
+    local = _localized([m for m in meetings if not m.all_day], tz)
+    busy = merge_runs(meetings)
+    focus = focus_time(meetings, iso_date)
+    return {
+        "timezone": local[0].start.tzname() if local else datetime.now(tz).tzname(),
+        "meetings": [
+            {"start": _hhmm(m.start), "end": _hhmm(m.end), "summary": m.summary,
+             **({"location": m.location} if m.location else {}),
+             **({"show_as": m.show_as} if m.show_as == "free" else {})}
+            for m in local
+        ],
+        "all_day": [m.summary for m in meetings if m.all_day],
+        "total_meeting_minutes": sum(b.minutes for b in busy),
+        "conflicts": [
+            {"first": c.first.summary, "second": c.second.summary,
+             "at": _hhmm(c.second.start), "overlap_minutes": c.overlap_minutes}
+            for c in find_conflicts(meetings)
+        ],
+        "back_to_back": [
+            {"start": _hhmm(b.start), "end": _hhmm(b.end), "count": len(b.meetings)}
+            for b in busy if len(b.meetings) > 1
+        ],
+        "free_blocks": [
+            {"start": _hhmm(b.start), "end": _hhmm(b.end), "minutes": b.minutes}
+            for b in free_blocks(meetings, iso_date)
+        ],
+        "focus_minutes": sum(b.minutes for b in focus),
+        "tight_transitions": [
+            {"from": t.before.summary, "to": t.after.summary, "gap_minutes": t.gap_minutes}
+            for t in tight_transitions(meetings)
+        ],
+    }
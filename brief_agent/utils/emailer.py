@@ -1,14 +1,25 @@
 import os
 import smtplib
 from email.message import EmailMessage
+from brief_agent.utils import metrics
 
-def send_email(subject: str, body: str):
+def send_email(subject: str, body: str | None, text: str | None = None):
+    """
+    Send `body` as HTML. When `text` is given the message is
+    multipart/alternative with `text` as the text/plain part; `body` may then
+    be None to send plain text only.
+    """
     msg = EmailMessage()
     msg["Subject"] = subject
     msg["From"] = os.getenv("SMTP_USER")
     msg["To"] = os.getenv("RECIPIENT")
-    # Send HTML content as the email body
-    msg.set_content(body, subtype="html")
+    if text is None:
+        # Send HTML content as the email body
+        msg.set_content(body, subtype="html")
+    else:
+        msg.set_content(text)
+        if body:
+            msg.add_alternative(body, subtype="html")
 
     host = os.getenv("SMTP_HOST")
     # Determine SMTP port: use default 465 if unset or invalid
@@ -20,6 +31,12 @@ def send_email(subject: str, body: str):
     user = os.getenv("SMTP_USER")
     pwd = os.getenv("SMTP_PASS")
 
-    with smtplib.SMTP_SSL(host, port) as smtp:
-        smtp.login(user, pwd)
-        smtp.send_message(msg)
\ No newline at end of file
+    status = "error"
+    try:
+        with metrics.SMTP_LATENCY.time():
+            with smtplib.SMTP_SSL(host, port) as smtp:
+                smtp.login(user, pwd)
+                smtp.send_message(msg)
+        status = "ok"
+    finally:
+        metrics.SMTP_SENDS.inc(status=status)
\ No newline at end of file
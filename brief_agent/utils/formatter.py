@@ -1,4 +1,5 @@
 from brief_agent.schema import Briefing
+from brief_agent.utils.analytics import to_local
 
 def build_email_body(briefing: Briefing) -> str:
     lines = []
@@ -11,8 +12,11 @@ def build_email_body(briefing: Briefing) -> str:
     lines.append("")
     lines.append("Meetings:")
     for m in briefing.meetings:
-        start = m.start.strftime("%H:%M")
-        end = m.end.strftime("%H:%M")
+        if m.all_day:
+            lines.append(f"- All day: {m.summary}")
+            continue
+        start = to_local(m.start).strftime("%H:%M")
+        end = to_local(m.end).strftime("%H:%M")
         lines.append(f"- {start}-{end}: {m.summary}")
     lines.append("")
     lines.append(f"Weather: {briefing.weather.min_c:.1f}°C - {briefing.weather.max_c:.1f}°C, Rain chance: {briefing.weather.rain_chance_pct}%")
@@ -0,0 +1,271 @@
+"""
+In-process metrics for the briefing agent.
+
+A minimal Prometheus-compatible registry (counters, gauges, histograms with
+labels), an HTTP `/metrics` endpoint for the scheduler daemon, and a rolling
+SQLite run-history table.
+
+    from brief_agent.utils import metrics
+    metrics.TOOL_CALLS.inc(tool="get_weather", status="ok")
+    with metrics.TOOL_LATENCY.time(tool="get_weather"):
+        ...
+    metrics.serve(9108)                        # background /metrics endpoint
+    metrics.record_run(started, seconds, "ok")  # LOG_DIR/run_history.sqlite
+
+Only the standard library is used; http.server and sqlite3 are imported
+when first needed.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+LabelKey = Tuple[str, ...]
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    """Escape a label value as the Prometheus text format requires."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], key: LabelKey, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, key)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> LabelKey:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, v in items:
+            yield f"{self.name}{_labels(self.labelnames, key)} {_fmt(v)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # key -> [bucket counts..., sum, count]
+        self._values: Dict[LabelKey, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            row = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        row = self._values.get(self._key(labels))
+        return row[-1] if row else 0
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        for key, row in items:
+            for bound, n in zip(self.buckets, row):
+                le = f'le="{_fmt(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {n}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(row[-2])}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {row[-1]}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, help: str, labelnames: Sequence[str], **kwargs):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, help, labelnames, **kwargs)
+            return self._metrics[name]
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get(Gauge, name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(m.render() for m in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+# ---------- briefing metrics ----------------------------------------------------
+RUNS = REGISTRY.counter("briefing_runs_total", "Briefing runs by outcome.", ["status"])
+RUN_DURATION = REGISTRY.histogram("briefing_run_duration_seconds", "End-to-end briefing run time.")
+LAST_SUCCESS = REGISTRY.gauge("briefing_last_success_timestamp_seconds", "Unix time of the last successful run.")
+SCHEDULER_LAG = REGISTRY.histogram(
+    "briefing_scheduler_lag_seconds", "Delay between the scheduled and actual run start.",
+    buckets=(1, 5, 15, 30, 60, 120, 300, 900),
+)
+LLM_CALLS = REGISTRY.counter("llm_calls_total", "Chat completion requests.", ["model", "status"])
+LLM_LATENCY = REGISTRY.histogram("llm_call_duration_seconds", "Chat completion latency.", ["model"])
+LLM_TOKENS = REGISTRY.counter("llm_tokens_total", "Tokens used by chat completions.", ["model", "kind"])
+TOOL_CALLS = REGISTRY.counter("tool_calls_total", "Tool invocations by outcome.", ["tool", "status"])
+TOOL_LATENCY = REGISTRY.histogram("tool_call_duration_seconds", "Tool invocation latency.", ["tool"])
+HTTP_REQUESTS = REGISTRY.counter("http_requests_total", "Outbound HTTP requests.", ["host", "status"])
+HTTP_LATENCY = REGISTRY.histogram("http_request_duration_seconds", "Outbound HTTP latency.", ["host"])
+SMTP_SENDS = REGISTRY.counter("smtp_sends_total", "E-mail sends by outcome.", ["status"])
+SMTP_LATENCY = REGISTRY.histogram("smtp_send_duration_seconds", "SMTP connect+send latency.")
+CACHE_REQUESTS = REGISTRY.counter("cache_requests_total", "Cache lookups.", ["cache", "result"])
+
+
+def instrument_requests() -> None:
+    """
+    Time every outbound `requests` call by host. Patches
+    `requests.Session.request` once; tools keep calling requests as usual.
+    """
+    import requests
+    from urllib.parse import urlparse
+
+    if getattr(requests.Session.request, "_brief_agent_metrics", False):
+        return
+    original = requests.Session.request
+
+    def request(self, method, url, *args, **kwargs):
+        host = urlparse(str(url)).hostname or ""
+        start = time.perf_counter()
+        status = "error"
+        try:
+            resp = original(self, method, url, *args, **kwargs)
+            status = str(resp.status_code)
+            return resp
+        finally:
+            HTTP_LATENCY.observe(time.perf_counter() - start, host=host)
+            HTTP_REQUESTS.inc(host=host, status=status)
+
+    request._brief_agent_metrics = True  # type: ignore[attr-defined]
+    requests.Session.request = request
+
+
+def serve(port: int, addr: str = "127.0.0.1", registry: Registry = REGISTRY):
+    """Serve `/metrics` from a daemon thread; returns the server."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((addr, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def record_run(started_at: float, duration_s: float, status: str,
+               error: Optional[str] = None, prompt_tokens: int = 0,
+               completion_tokens: int = 0, db_path: Optional[str] = None) -> None:
+    """
+    Append a run to the SQLite run history (RUN_HISTORY_DB, default
+    LOG_DIR/run_history.sqlite) and prune rows older than RUN_HISTORY_DAYS
+    (default 90). Both are read per call so values from .env apply.
+    """
+    import sqlite3
+
+    path = db_path or os.getenv(
+        "RUN_HISTORY_DB", os.path.join(os.getenv("LOG_DIR", "logs"), "run_history.sqlite")
+    )
+    keep_days = int(os.getenv("RUN_HISTORY_DAYS", "90"))
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            " started_at REAL NOT NULL, duration_s REAL NOT NULL, status TEXT NOT NULL,"
+            " error TEXT, prompt_tokens INTEGER, completion_tokens INTEGER)"
+        )
+        conn.execute(
+            "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?)",
+            (started_at, duration_s, status, error, prompt_tokens, completion_tokens),
+        )
+        conn.execute("DELETE FROM runs WHERE started_at < ?", (time.time() - keep_days * 86400,))
+    conn.close()
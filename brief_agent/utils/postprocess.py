@@ -0,0 +1,333 @@
+"""
+E-mail post-processing: turns the model's HTML into a compact
+multipart/alternative message.
+
+1. Links: headline URLs (long news.google.com redirects) are resolved in the
+   background as soon as the headlines are fetched (`prefetch_links`), so
+   resolution overlaps the LLM turns. `finalize()` waits at most
+   LINK_DEADLINE seconds for them and rewrites this run's headline links
+   with whatever has resolved. Resolved redirects are cached in memory and
+   in LINK_CACHE across runs; entries older than LINK_CACHE_DAYS (30) are
+   dropped when the cache is saved.
+2. CSS: inline `style` attributes stay inline (many clients drop <style>
+   blocks) but are normalised; whitespace between tags is collapsed to a
+   single space, or removed next to block-level tags. EMAIL_STYLE_CLASSES=1
+   additionally moves repeated styles into short classes in a <style> block.
+3. A text/plain part is rendered from the structured tool payloads rather
+   than scraped from the HTML.
+4. Size budget: if the HTML is still over EMAIL_SIZE_BUDGET bytes (Gmail
+   clips at ~102 KB) only the plain-text part is sent, cut on a line
+   boundary to the same budget.
+
+Settings are read per call, so values loaded from .env apply.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+REQUEST_TIMEOUT = 5
+
+_REDIRECT_HOSTS = ("news.google.com",)
+_TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|oc|ocid)$")
+
+# redirect URL -> (resolved URL, unix time it was resolved)
+_cache: Dict[str, Tuple[str, float]] = {}
+_cache_loaded = False
+_pending: Dict[str, Future] = {}
+_lock = threading.Lock()
+_pool: Optional[ThreadPoolExecutor] = None
+
+logger = logging.getLogger("briefing")
+
+
+# ---------- links -----------------------------------------------------------------
+def _cache_path() -> str:
+    return os.getenv("LINK_CACHE", os.path.join(os.getenv("LOG_DIR", "logs"), "link_cache.json"))
+
+
+def _load_cache() -> None:
+    global _cache_loaded
+    if _cache_loaded:
+        return
+    _cache_loaded = True
+    try:
+        with open(_cache_path()) as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return
+    now = time.time()
+    for url, entry in entries.items():
+        # plain-string entries predate timestamps; age them from now
+        resolved, at = (entry, now) if isinstance(entry, str) else entry
+        _cache[url] = (resolved, float(at))
+
+
+def _save_cache() -> None:
+    path = _cache_path()
+    cutoff = time.time() - float(os.getenv("LINK_CACHE_DAYS", "30")) * 86400
+    for url in [u for u, (_, at) in _cache.items() if at < cutoff]:
+        del _cache[url]
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(_cache, f)
+    except OSError as e:
+        logger.warning("Could not write link cache %s: %s", path, e)
+
+
+def clean_url(url: str) -> str:
+    """Drop tracking query parameters and fragments."""
+    parts = urlparse(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not _TRACKING_PARAMS.match(k)]
+    return urlunparse(parts._replace(query=urlencode(query), fragment=""))
+
+
+def _resolve(url: str) -> str:
+    import requests
+
+    resp = requests.head(url, allow_redirects=True, timeout=REQUEST_TIMEOUT)
+    return clean_url(resp.url or url)
+
+
+def _is_redirect(url: str) -> bool:
+    return urlparse(url).hostname in _REDIRECT_HOSTS
+
+
+def prefetch_links(urls: Iterable[str]) -> None:
+    """Start resolving redirect URLs in the background (non-blocking)."""
+    global _pool
+    with _lock:
+        _load_cache()
+        for url in urls:
+            if not _is_redirect(url) or url in _cache or url in _pending:
+                continue
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="link-resolve")
+            _pending[url] = _pool.submit(_resolve, url)
+
+
+def resolved_links(urls: Iterable[str], deadline: Optional[float] = None) -> Dict[str, str]:
+    """
+    Map each of `urls` to its clean destination, waiting up to `deadline`
+    seconds (default LINK_DEADLINE, 3) for pending resolutions. Redirects
+    that have not resolved in time are left out.
+    """
+    if deadline is None:
+        deadline = float(os.getenv("LINK_DEADLINE", "3"))
+    urls = set(urls)
+    with _lock:
+        _load_cache()
+        pending = {url: fut for url, fut in _pending.items() if url in urls}
+    if pending:
+        wait(pending.values(), timeout=deadline)
+    with _lock:
+        changed = False
+        for url, fut in pending.items():
+            if fut.done():
+                _pending.pop(url, None)
+                if fut.exception() is None:
+                    _cache[url] = (fut.result(), time.time())
+                    changed = True
+        if changed:
+            _save_cache()
+        mapping = {}
+        for url in urls:
+            if not _is_redirect(url):
+                mapping[url] = clean_url(url)
+            elif url in _cache:
+                mapping[url] = _cache[url][0]
+        return mapping
+
+
+def rewrite_links(html: str, mapping: Dict[str, str]) -> str:
+    for src in sorted(mapping, key=len, reverse=True):
+        dst = mapping[src]
+        if src != dst:
+            html = html.replace(src, dst).replace(src.replace("&", "&amp;"), dst.replace("&", "&amp;"))
+    return html
+
+
+# ---------- HTML/CSS ----------------------------------------------------------------
+_STYLE_ATTR = re.compile(r'\sstyle\s*=\s*(["\'])(.*?)\1', re.I | re.S)
+_CLASS_ATTR = re.compile(r'\sclass\s*=\s*(["\'])(.*?)\1', re.I | re.S)
+_TAG = re.compile(r"<([a-zA-Z][\w-]*)([^<>]*)>")
+_PRE = re.compile(r"(<(pre|textarea)\b.*?</\2\s*>)", re.I | re.S)
+_BLOCK_TAGS = (r"address|article|aside|blockquote|body|br|center|dd|div|dl|dt|footer|h[1-6]|"
+               r"head|header|hr|html|li|meta|ol|p|section|style|table|tbody|td|tfoot|th|"
+               r"thead|title|tr|ul")
+_SPACE_AFTER_BLOCK = re.compile(r"(</?(?:%s)\b[^<>]*>) (?=<)" % _BLOCK_TAGS, re.I)
+_SPACE_BEFORE_BLOCK = re.compile(r"(?<=>) (?=</?(?:%s)\b)" % _BLOCK_TAGS, re.I)
+_QUOTE_ENTITIES = {'"': "&quot;", "'": "&#39;"}
+
+
+def _split_declarations(css: str) -> List[str]:
+    """Split on `;` outside parentheses and quotes, e.g. url(data:...;base64,...)."""
+    decls, depth, quote, start = [], 0, None, 0
+    for i, ch in enumerate(css):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth = max(depth - 1, 0)
+        elif ch == ";" and depth == 0:
+            decls.append(css[start:i])
+            start = i + 1
+    decls.append(css[start:])
+    return decls
+
+
+def _normalize_css(css: str) -> str:
+    decls = []
+    for decl in _split_declarations(css):
+        if ":" in decl:
+            prop, value = decl.split(":", 1)
+            value = " ".join(value.split())
+            if value:
+                decls.append(f"{prop.strip().lower()}:{value}")
+    return ";".join(decls)
+
+
+def _style_attr(css: str, quote: str) -> str:
+    """Re-emit a style attribute with its original quote, escaping it inside the value."""
+    return f" style={quote}{css.replace(quote, _QUOTE_ENTITIES[quote])}{quote}"
+
+
+def _collapse_whitespace(html: str) -> str:
+    html = re.sub(r">\s+<", "> <", html)
+    html = _SPACE_AFTER_BLOCK.sub(r"\1", html)
+    return _SPACE_BEFORE_BLOCK.sub("", html)
+
+
+def minify_html(html: str, extract_classes: bool = False) -> str:
+    """
+    Normalise inline styles and collapse inter-tag whitespace; <pre> and
+    <textarea> content is left alone. With `extract_classes`, styles used
+    more than once move into a shared <style> block of short classes.
+    """
+    counts = Counter(_normalize_css(m.group(2)) for m in _STYLE_ATTR.finditer(html))
+    classes = {}
+    if extract_classes:
+        classes = {css: f"s{i}" for i, (css, n) in enumerate(counts.most_common()) if n > 1 and css}
+
+    def retag(m: re.Match) -> str:
+        name, attrs = m.group(1), m.group(2)
+        style = _STYLE_ATTR.search(attrs)
+        if not style:
+            return m.group(0)
+        css = _normalize_css(style.group(2))
+        if css not in classes:
+            attrs = _STYLE_ATTR.sub(lambda s: _style_attr(css, s.group(1)), attrs, count=1)
+            return f"<{name}{attrs}>"
+        attrs = _STYLE_ATTR.sub("", attrs, count=1)
+        cls = _CLASS_ATTR.search(attrs)
+        if cls:
+            attrs = _CLASS_ATTR.sub(lambda c: f' class="{c.group(2)} {classes[css]}"', attrs, count=1)
+        else:
+            attrs = f' class="{classes[css]}"' + attrs
+        return f"<{name}{attrs}>"
+
+    # split() yields [text, pre block, tag name, text, ...]; minify the text runs
+    # only, dropping their whitespace next to the (block-level) pre blocks
+    parts = _PRE.split(_TAG.sub(retag, html.strip()))
+    texts = parts[::3]
+    for i, part in enumerate(texts):
+        part = _collapse_whitespace(part)
+        part = part.lstrip() if i > 0 else part
+        texts[i] = part.rstrip() if i < len(texts) - 1 else part
+    html = "".join(t + (parts[3 * i + 1] if 3 * i + 1 < len(parts) else "")
+                   for i, t in enumerate(texts))
+    if classes:
+        sheet = "".join(f".{c}{{{css}}}" for css, c in classes.items())
+        html = f"<style>{sheet}</style>" + html
+    return html
+
+
+# ---------- text/plain --------------------------------------------------------------
+def render_text(payloads: Dict[str, object], today_iso: str,
+                links: Optional[Dict[str, str]] = None) -> str:
+    """
+    Plain-text briefing from the tool payloads collected during the run;
+    headline URLs are replaced through `links` (see resolved_links).
+    """
+    lines = [f"Executive Daily Briefing - {today_iso}", "=" * 40]
+    links = links or {}
+
+    headlines = payloads.get("get_headlines") or []
+    if headlines:
+        lines += ["", "TECHNICAL HEADLINES"]
+        for h in headlines:
+            lines.append(f"- {h['title']}")
+            lines.append(f"  {links.get(h['url'], h['url'])}")
+
+    meetings = payloads.get("get_meetings") or {}
+    if meetings.get("meetings") or meetings.get("all_day"):
+        lines += ["", f"MEETINGS & COMMITMENTS ({meetings.get('timezone', 'AEST')})"]
+        for summary in meetings.get("all_day", []):
+            lines.append(f"- All day: {summary}")
+        for m in meetings.get("meetings", []):
+            lines.append(f"- {m['start']}-{m['end']}: {m['summary']}")
+        for c in meetings.get("conflicts", []):
+            lines.append(f"! Conflict at {c['at']}: {c['first']} / {c['second']}")
+
+    weather = payloads.get("get_weather")
+    if weather:
+        lines += ["", "WEATHER",
+                  f"{weather['min_c']:.1f}°C - {weather['max_c']:.1f}°C, rain chance {weather['rain_chance_pct']}%"]
+        if weather.get("umbrella_at"):
+            lines.append(f"Umbrella advisable at {', '.join(weather['umbrella_at'])}")
+
+    markets = payloads.get("get_financials")
+    if markets:
+        lines += ["", "MARKETS OVERNIGHT",
+                  f"AUD -> USD: {markets['aud_usd']:.4f}",
+                  f"NASDAQ previous close: {markets['nasdaq_close']}"]
+    return "\n".join(lines) + "\n"
+
+
+# ---------- pipeline ----------------------------------------------------------------
+def _truncate_lines(text: str, budget: int) -> str:
+    """Keep whole lines of `text` while its UTF-8 size fits `budget` bytes."""
+    if len(text.encode()) <= budget:
+        return text
+    out, size = [], 0
+    for line in text.splitlines(keepends=True):
+        size += len(line.encode())
+        if size > budget:
+            break
+        out.append(line)
+    return "".join(out)
+
+
+def finalize(html: str, payloads: Dict[str, object], today_iso: str,
+             budget: Optional[int] = None) -> Tuple[Optional[str], str]:
+    """
+    Return (html, text) ready for `send_email`. html is None when the HTML
+    part cannot fit the size budget (EMAIL_SIZE_BUDGET) even after
+    minification.
+    """
+    if budget is None:
+        budget = int(os.getenv("EMAIL_SIZE_BUDGET", "100000"))
+    extract_classes = os.getenv("EMAIL_STYLE_CLASSES", "0") == "1"
+    links = resolved_links(h["url"] for h in payloads.get("get_headlines") or [])
+    html = minify_html(rewrite_links(html, links), extract_classes=extract_classes)
+    text = _truncate_lines(render_text(payloads, today_iso, links), budget)
+    size = len(html.encode())
+    if size > budget:
+        logger.warning("HTML e-mail is %d bytes (budget %d); sending text/plain only", size, budget)
+        return None, text
+    return html, text
@@ -0,0 +1,154 @@
+"""
+Per-run CPU and memory profiling.
+
+    with profiled("run"):
+        ...
+
+writes, next to the run log in LOG_DIR:
+
+    profile_<date>_<label>_<time>_<pid>.collapsed   sampled stacks, one "a;b;c count"
+                                                    line per stack (flamegraph.pl /
+                                                    speedscope input)
+    profile_<date>_<label>_<time>_<pid>.alloc.txt   tracemalloc top-N allocation
+                                                    sites and peak traced memory
+    profile_<date>_<label>_<time>_<pid>.pstats.txt  cProfile top-N by cumulative
+                                                    time (deterministic mode only)
+
+The sampler and tracemalloc (one frame per trace) are cheap enough to leave on
+for a sampled share of production runs: set PROFILE_SAMPLE_RATE (0.0-1.0).
+`--profile` on the CLI also enables the deterministic cProfile pass.
+PROFILE_* settings are read per call, so values loaded from .env apply.
+"""
+
+from __future__ import annotations
+
+import datetime
+import io
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+def should_profile() -> bool:
+    """True for a PROFILE_SAMPLE_RATE share of calls; an invalid rate counts as 0."""
+    try:
+        rate = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    except ValueError:
+        return False
+    return rate > 0 and random.random() < rate
+
+
+class StackSampler:
+    """Background thread sampling every thread's Python stack at a fixed interval."""
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = interval or float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack: List[str] = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+
+def _alloc_report(snapshot, peak: int, top_n: int) -> str:
+    lines = [f"peak traced memory: {peak / 1024:.1f} KiB", f"top {top_n} allocation sites:"]
+    for stat in snapshot.statistics("lineno")[:top_n]:
+        lines.append(str(stat))
+    return "\n".join(lines) + "\n"
+
+
+def _pstats_report(profile, top_n: int) -> str:
+    import pstats
+
+    out = io.StringIO()
+    pstats.Stats(profile, stream=out).sort_stats("cumulative").print_stats(top_n)
+    return out.getvalue()
+
+
+@contextmanager
+def profiled(label: str, deterministic: bool = False, out_dir: str = None,
+             top_n: Optional[int] = None) -> Iterator[str]:
+    """
+    Profile the enclosed block and write reports to `out_dir` (default LOG_DIR).
+    Yields the report path prefix. Failing to write the reports is logged,
+    never raised, so it cannot fail the profiled run.
+    """
+    import tracemalloc
+
+    out_dir = out_dir or os.getenv("LOG_DIR", "logs")
+    top_n = top_n or int(os.getenv("PROFILE_TOP_N", "25"))
+    now = datetime.datetime.now()
+    # microseconds + pid keep concurrent or same-second runs apart
+    base = os.path.join(
+        out_dir, f"profile_{now.date().isoformat()}_{label}_{now:%H%M%S_%f}_{os.getpid()}"
+    )
+
+    started_tracemalloc = not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start(1)
+    tracemalloc.reset_peak()
+    sampler = StackSampler()
+    sampler.start()
+    profile = None
+    if deterministic:
+        import cProfile
+        profile = cProfile.Profile()
+        profile.enable()
+    t = time.perf_counter()
+    try:
+        yield base
+    finally:
+        if profile is not None:
+            profile.disable()
+        sampler.stop()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        if started_tracemalloc:
+            tracemalloc.stop()
+
+        logger = logging.getLogger("briefing")
+        try:
+            os.makedirs(out_dir, exist_ok=True)
+            with open(base + ".collapsed", "w") as f:
+                f.write(sampler.collapsed())
+            with open(base + ".alloc.txt", "w") as f:
+                f.write(_alloc_report(snapshot, peak, top_n))
+            if profile is not None:
+                with open(base + ".pstats.txt", "w") as f:
+                    f.write(_pstats_report(profile, top_n))
+            logger.info(
+                "Profile for %s (%.1fs, peak %.1f KiB) written to %s.*",
+                label, time.perf_counter() - t, peak / 1024, base,
+            )
+        except Exception as e:
+            logger.error("Could not write profile reports to %s.*: %s", base, e)
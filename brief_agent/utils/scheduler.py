@@ -1,9 +1,37 @@
-import schedule
+import datetime
+import logging
+import os
 import time
-from brief_agent.agent_runner import run_briefing
 
-def start():
-    schedule.every().day.at("06:30").do(run_briefing)
+
+def start(at: str = "06:30"):
+    import schedule
+    from brief_agent.config import load_env
+    from brief_agent.utils import metrics
+
+    load_env()
+    from brief_agent.agent_runner import run_briefing
+
+    logger = logging.getLogger("briefing")
+    # /metrics endpoint for the long-lived scheduler; empty METRICS_PORT disables it
+    port = os.getenv("METRICS_PORT", "9108")
+    if port:
+        try:
+            metrics.serve(int(port))
+        except (OSError, ValueError) as e:
+            logger.error("Metrics endpoint on port %s unavailable (%s); scheduling without it", port, e)
+    metrics.instrument_requests()
+
+    def job_fn():
+        # job.next_run still holds the slot being run
+        metrics.SCHEDULER_LAG.observe(max(0.0, (datetime.datetime.now() - job.next_run).total_seconds()))
+        try:
+            run_briefing()
+        except Exception:
+            # already counted and logged by run_briefing; keep the daemon alive
+            logger.exception("Scheduled briefing failed")
+
+    job = schedule.every().day.at(at).do(job_fn)
     while True:
         schedule.run_pending()
-        time.sleep(30)
\ No newline at end of file
+        time.sleep(30)
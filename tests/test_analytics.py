@@ -0,0 +1,89 @@
+from datetime import datetime
+
+import pytest
+from brief_agent.schema import Meeting
+from brief_agent.utils.analytics import (
+    find_conflicts, focus_time, free_blocks, merge_runs, summarize, tight_transitions, to_local,
+)
+
+@pytest.fixture(autouse=True)
+def melbourne(monkeypatch):
+    monkeypatch.setenv("BRIEFING_TZ", "Australia/Melbourne")
+
+def _m(start, end, summary, location="", **flags):
+    # Graph returns naive UTC; local 2025-06-02 (AEST, UTC+10) starts at 2025-06-01T14:00Z
+    day = "2025-06-01" if start >= "14:00" else "2025-06-02"
+    return Meeting(
+        start=datetime.fromisoformat(f"{day}T{start}"),
+        end=datetime.fromisoformat(f"{day}T{end}"),
+        summary=summary,
+        location=location,
+        **flags,
+    )
+
+MEETINGS = [
+    _m("23:00", "23:30", "Standup", "Microsoft Teams Meeting"),   # 09:00-09:30
+    _m("23:30", "23:59", "1:1"),                                 # 09:30-09:59 (back-to-back)
+    _m("02:00", "03:00", "Client A", "Collins St"),             # 12:00-13:00
+    _m("02:30", "03:30", "Board prep"),                          # 12:30-13:30 (double-booked)
+    _m("03:40", "04:30", "Client B", "Docklands"),              # 13:40-14:30
+]
+
+def test_to_local_treats_naive_as_utc():
+    local = to_local(datetime(2025, 6, 1, 23, 0))
+    assert (local.date().isoformat(), local.strftime("%H:%M"), local.tzname()) == ("2025-06-02", "09:00", "AEST")
+
+def test_find_conflicts_reports_overlapping_pair():
+    conflicts = find_conflicts(MEETINGS)
+    assert [(c.first.summary, c.second.summary, c.overlap_minutes) for c in conflicts] == [
+        ("Client A", "Board prep", 30)
+    ]
+
+def test_merge_runs_joins_back_to_back_and_overlapping():
+    blocks = merge_runs(MEETINGS)
+    assert [(b.start.strftime("%H:%M"), b.end.strftime("%H:%M"), len(b.meetings)) for b in blocks] == [
+        ("09:00", "09:59", 2), ("12:00", "13:30", 2), ("13:40", "14:30", 1),
+    ]
+
+def test_free_blocks_and_focus_time():
+    free = [(b.start.strftime("%H:%M"), b.end.strftime("%H:%M")) for b in free_blocks(MEETINGS, "2025-06-02")]
+    assert free == [("09:59", "12:00"), ("14:30", "17:00")]
+    assert sum(b.minutes for b in focus_time(MEETINGS, "2025-06-02")) == 121 + 150
+
+def test_tight_transitions_ignore_online_meetings():
+    assert tight_transitions(MEETINGS) == []
+    tight = tight_transitions(MEETINGS, travel_minutes=45)
+    assert [(t.before.summary, t.after.summary, t.gap_minutes) for t in tight] == [("Client A", "Client B", 40)]
+
+def test_summarize_is_compact_and_local():
+    facts = summarize(MEETINGS, "2025-06-02")
+    assert facts["timezone"] == "AEST"
+    assert facts["meetings"][0] == {"start": "09:00", "end": "09:30", "summary": "Standup", "location": "Microsoft Teams Meeting"}
+    assert facts["conflicts"] == [{"first": "Client A", "second": "Board prep", "at": "12:30", "overlap_minutes": 30}]
+    assert facts["total_meeting_minutes"] == 59 + 90 + 50
+
+def test_summarize_empty_day():
+    facts = summarize([], "2025-06-02")
+    assert facts["meetings"] == [] and facts["conflicts"] == []
+    assert facts["free_blocks"] == [{"start": "09:00", "end": "17:00", "minutes": 480}]
+
+# all-day event: local midnight to midnight, i.e. 14:00Z to 14:00Z
+ALL_DAY = Meeting(start=datetime(2025, 6, 1, 14, 0), end=datetime(2025, 6, 2, 14, 0),
+                  summary="Public holiday", all_day=True)
+FREE = _m("00:00", "01:00", "Lunch hold", "Collins St", show_as="free")  # 10:00-11:00
+
+def test_all_day_and_free_events_are_not_busy_time():
+    meetings = MEETINGS + [ALL_DAY, FREE]
+    assert [(c.first.summary, c.second.summary) for c in find_conflicts(meetings)] == [("Client A", "Board prep")]
+    assert len(merge_runs(meetings)) == len(merge_runs(MEETINGS))
+    assert free_blocks(meetings, "2025-06-02") == free_blocks(MEETINGS, "2025-06-02")
+    assert tight_transitions(meetings, travel_minutes=45) == tight_transitions(MEETINGS, travel_minutes=45)
+
+def test_summarize_lists_all_day_and_free_events():
+    facts = summarize(MEETINGS + [ALL_DAY, FREE], "2025-06-02")
+    assert facts["all_day"] == ["Public holiday"]
+    assert "Public holiday" not in [m["summary"] for m in facts["meetings"]]
+    assert {"start": "10:00", "end": "11:00", "summary": "Lunch hold", "location": "Collins St",
+            "show_as": "free"} in facts["meetings"]
+    assert facts["total_meeting_minutes"] == 59 + 90 + 50
+    assert facts["focus_minutes"] == 121 + 150
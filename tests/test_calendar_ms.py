@@ -2,6 +2,7 @@ import datetime
 import pytest
 from brief_agent.tools.calendar_ms import get_meetings
 from brief_agent.schema import Meeting
+from brief_agent.utils.analytics import to_local
 
 def test_get_meetings_returns_list_of_meetings():
     """
@@ -16,7 +17,66 @@ def test_get_meetings_returns_list_of_meetings():
     assert isinstance(meetings, list)
     for m in meetings:
         assert isinstance(m, Meeting)
-        # Meeting start/end should correspond to the requested date
-        assert m.start.isoformat().startswith(iso_date)
-        assert m.end.isoformat().startswith(iso_date)
-        assert isinstance(m.summary, str)
\ No newline at end of file
+        # Meetings overlap the requested local date (times are naive UTC)
+        assert to_local(m.start).date().isoformat() <= iso_date
+        assert to_local(m.end).date().isoformat() >= iso_date
+        assert isinstance(m.summary, str)
+
+def test_query_window_covers_local_day(monkeypatch):
+    """
+    The Graph window runs from local midnight to local midnight, expressed in
+    UTC, so early-morning local meetings are included and next-day ones are not.
+    """
+    from brief_agent.tools import calendar_ms
+
+    monkeypatch.setenv("BRIEFING_TZ", "Australia/Melbourne")
+    monkeypatch.delenv("GITHUB_ACTIONS", raising=False)
+    urls = []
+
+    class DummyResponse:
+        def raise_for_status(self):
+            pass
+        def json(self):
+            return {"value": [{"start": {"dateTime": "2025-06-01T22:00:00"},
+                               "end": {"dateTime": "2025-06-01T22:30:00"},
+                               "subject": "Early call"}]}
+
+    def fake_get(url, headers=None):
+        urls.append(url)
+        return DummyResponse()
+
+    monkeypatch.setattr(calendar_ms, "_acquire_token", lambda: "token")
+    monkeypatch.setattr("brief_agent.tools.calendar_ms.requests.get", fake_get)
+    meetings = calendar_ms.get_meetings("2025-06-02")
+    assert "startDateTime=2025-06-01T14:00:00Z&endDateTime=2025-06-02T14:00:00Z" in urls[0]
+    assert to_local(meetings[0].start).strftime("%Y-%m-%d %H:%M") == "2025-06-02 08:00"
+    # AEDT (UTC+11) in summer
+    assert calendar_ms._utc_window("2025-01-02") == ("2025-01-01T13:00:00Z", "2025-01-02T13:00:00Z")
+
+def test_get_meetings_skips_cancelled_and_flags_all_day_and_free(monkeypatch):
+    from brief_agent.tools import calendar_ms
+
+    monkeypatch.delenv("GITHUB_ACTIONS", raising=False)
+    events = [
+        {"start": {"dateTime": "2025-06-01T23:00:00"}, "end": {"dateTime": "2025-06-01T23:30:00"},
+         "subject": "Standup", "showAs": "busy"},
+        {"start": {"dateTime": "2025-06-02T00:00:00"}, "end": {"dateTime": "2025-06-02T01:00:00"},
+         "subject": "Moved", "isCancelled": True},
+        {"start": {"dateTime": "2025-06-01T14:00:00"}, "end": {"dateTime": "2025-06-02T14:00:00"},
+         "subject": "Public holiday", "isAllDay": True, "showAs": "free"},
+        {"start": {"dateTime": "2025-06-02T02:00:00"}, "end": {"dateTime": "2025-06-02T03:00:00"},
+         "subject": "Lunch hold", "showAs": "free"},
+    ]
+
+    class DummyResponse:
+        def raise_for_status(self):
+            pass
+        def json(self):
+            return {"value": events}
+
+    monkeypatch.setattr(calendar_ms, "_acquire_token", lambda: "token")
+    monkeypatch.setattr("brief_agent.tools.calendar_ms.requests.get", lambda url, headers=None: DummyResponse())
+    meetings = calendar_ms.get_meetings("2025-06-02")
+    assert [(m.summary, m.all_day, m.show_as) for m in meetings] == [
+        ("Standup", False, "busy"), ("Public holiday", True, "free"), ("Lunch hold", False, "free"),
+    ]
@@ -0,0 +1,74 @@
+import json
+import os
+import subprocess
+import sys
+
+from brief_agent.cli import build_parser, main
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+HEAVY_MODULES = ("openai", "requests", "msal", "dotenv", "schedule")
+# generous ceiling for a cold `import brief_agent.cli` plus the runner/scheduler
+IMPORT_BUDGET_MS = 150
+
+
+def _probe(code: str) -> str:
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True, text=True, cwd=_PROJECT_ROOT, check=True,
+    )
+    return proc.stdout.strip()
+
+
+def test_startup_does_not_import_heavy_dependencies():
+    """
+    Importing the CLI, runner and scheduler must not pull in openai, requests,
+    msal, python-dotenv or schedule; commands import those when they run.
+    """
+    out = _probe(
+        "import sys, json\n"
+        "import brief_agent.cli, brief_agent.agent_runner, brief_agent.utils.scheduler\n"
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    assert json.loads(out) == []
+
+
+def test_startup_import_time_budget():
+    out = _probe(
+        "import time\n"
+        "t = time.perf_counter()\n"
+        "import brief_agent.cli, brief_agent.agent_runner, brief_agent.utils.scheduler\n"
+        "print((time.perf_counter() - t) * 1000)"
+    )
+    assert float(out) < IMPORT_BUDGET_MS
+
+
+def test_parser_defaults_to_no_command():
+    args = build_parser().parse_args([])
+    assert args.command is None
+    args = build_parser().parse_args(["fetch", "weather", "--date", "2025-01-02"])
+    assert args.tool == "weather"
+    assert args.date == "2025-01-02"
+
+
+def test_fetch_prints_tool_payload(monkeypatch, capsys):
+    calls = []
+
+    def fake_call_tool(fn_name, args):
+        calls.append((fn_name, args))
+        return {"aud_usd": 0.65, "nasdaq_close": 15000.0}
+
+    monkeypatch.setattr("brief_agent.agent_runner.call_tool", fake_call_tool)
+    monkeypatch.setattr("brief_agent.config.load_env", lambda: None)
+    assert main(["fetch", "financials"]) == 0
+    assert calls == [("get_financials", {})]
+    assert json.loads(capsys.readouterr().out)["aud_usd"] == 0.65
+
+
+def test_log_dir_from_env_is_read_at_setup(monkeypatch, tmp_path):
+    from brief_agent import agent_runner
+
+    monkeypatch.setenv("LOG_DIR", str(tmp_path))
+    logger = agent_runner._setup_logger("2025-01-02")
+    logger.info("hello")
+    assert (tmp_path / "briefing_2025-01-02.log").exists()
+    logger.handlers.clear()
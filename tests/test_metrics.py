@@ -0,0 +1,72 @@
+import sqlite3
+import time
+import urllib.request
+
+import pytest
+from brief_agent.utils import metrics
+from brief_agent.utils.metrics import Registry, record_run, serve
+
+def test_counter_and_histogram_render_prometheus_text():
+    reg = Registry()
+    calls = reg.counter("tool_calls_total", "Tool calls.", ["tool", "status"])
+    latency = reg.histogram("tool_call_duration_seconds", "Latency.", ["tool"], buckets=(0.1, 1.0))
+    calls.inc(tool="get_weather", status="ok")
+    calls.inc(2, tool="get_weather", status="ok")
+    latency.observe(0.05, tool="get_weather")
+    latency.observe(0.5, tool="get_weather")
+    text = reg.render()
+    assert "# TYPE tool_calls_total counter" in text
+    assert 'tool_calls_total{tool="get_weather",status="ok"} 3' in text
+    assert 'tool_call_duration_seconds_bucket{tool="get_weather",le="0.1"} 1' in text
+    assert 'tool_call_duration_seconds_bucket{tool="get_weather",le="+Inf"} 2' in text
+    assert 'tool_call_duration_seconds_count{tool="get_weather"} 2' in text
+    assert reg.counter("tool_calls_total", "Tool calls.") is calls
+
+def test_metrics_endpoint_serves_registry():
+    reg = Registry()
+    reg.counter("briefing_runs_total", "Runs.", ["status"]).inc(status="ok")
+    server = serve(0, registry=reg)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        body = urllib.request.urlopen(url, timeout=5).read().decode()
+    finally:
+        server.shutdown()
+    assert 'briefing_runs_total{status="ok"} 1' in body
+
+def test_record_run_appends_and_prunes(tmp_path, monkeypatch):
+    db = str(tmp_path / "history.sqlite")
+    monkeypatch.setenv("RUN_HISTORY_DAYS", "30")
+    record_run(time.time() - 40 * 86400, 12.0, "ok", db_path=db)
+    record_run(time.time(), 8.5, "error", "SMTP timeout", 1200, 300, db_path=db)
+    with sqlite3.connect(db) as conn:
+        rows = conn.execute("SELECT duration_s, status, error, prompt_tokens FROM runs").fetchall()
+    assert rows == [(8.5, "error", "SMTP timeout", 1200)]
+
+def test_label_values_are_escaped():
+    reg = Registry()
+    reg.counter("http_requests_total", "Requests.", ["host"]).inc(host='ev"il\\host\nx')
+    assert 'http_requests_total{host="ev\\"il\\\\host\\nx"} 1' in reg.render()
+
+def test_scheduler_survives_metrics_port_in_use(monkeypatch):
+    from brief_agent.utils import scheduler
+
+    busy = serve(0, registry=Registry())
+    monkeypatch.setenv("METRICS_PORT", str(busy.server_address[1]))
+    monkeypatch.setattr("brief_agent.config.load_env", lambda: None)
+    monkeypatch.setattr(metrics, "instrument_requests", lambda: None)
+
+    class Stop(Exception):
+        pass
+
+    def stop(_):
+        raise Stop
+
+    monkeypatch.setattr(scheduler.time, "sleep", stop)
+    try:
+        with pytest.raises(Stop):
+            scheduler.start()
+    finally:
+        import schedule
+        schedule.clear()
+        busy.shutdown()
+        busy.server_close()
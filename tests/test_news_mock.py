@@ -0,0 +1,79 @@
+import time
+import pytest
+from brief_agent.tools import news
+from brief_agent.tools.news import get_headlines, parse_feed, topic_query
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel>
+  <item><title>Quantum chip ships</title><link>https://example.com/q</link>
+        <pubDate>Thu, 02 Jan 2025 03:00:00 GMT</pubDate><source url="https://abc.net.au">ABC</source></item>
+  <item><title>Old robotics story</title><link>https://example.com/old</link>
+        <pubDate>Mon, 30 Dec 2024 03:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+ATOM = b"""<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry><title>GenAI in consulting</title><link href="https://blog.example.com/genai"/>
+         <updated>2025-01-02T01:00:00Z</updated></entry>
+  <entry><title>Quantum chip ships</title><link href="https://example.com/q"/>
+         <updated>2025-01-02T02:00:00Z</updated></entry>
+</feed>"""
+
+class DummyResponse:
+    def __init__(self, content):
+        self.content = content
+    def raise_for_status(self):
+        pass
+
+@pytest.fixture
+def fetched(monkeypatch):
+    fetched = []
+
+    def fake_get(url, params=None, timeout=None):
+        fetched.append(url)
+        if "news.google.com" in url:
+            return DummyResponse(RSS)
+        if "blog.example.com" in url:
+            return DummyResponse(ATOM)
+        raise RuntimeError(f"Unexpected URL called: {url}")
+
+    monkeypatch.setattr("brief_agent.tools.news.requests.get", fake_get)
+    monkeypatch.delenv("NEWSAPI_KEY", raising=False)
+    monkeypatch.setenv("NEWS_FEEDS", "https://blog.example.com/atom.xml")
+    return fetched
+
+def test_parse_feed_handles_rss_and_atom():
+    rss = parse_feed(RSS, "fallback")
+    assert [(h.title, h.source) for h in rss] == [("Quantum chip ships", "ABC"), ("Old robotics story", "fallback")]
+    assert rss[0].published.isoformat() == "2025-01-02T03:00:00+00:00"
+    atom = parse_feed(ATOM, "blog")
+    assert atom[0].url == "https://blog.example.com/genai"
+    assert atom[0].published.isoformat() == "2025-01-02T01:00:00+00:00"
+
+def test_get_headlines_merges_sources_and_uses_query(fetched, monkeypatch):
+    monkeypatch.setenv("NEWS_SOURCES", "google_au,feeds")
+    headlines = get_headlines("2025-01-02", query="robotics AU", page_size=5)
+    assert [h.title for h in headlines] == ["Quantum chip ships", "GenAI in consulting", "Old robotics story"]
+    assert any("robotics+AU" in url for url in fetched)
+
+def test_get_headlines_respects_deadline(fetched, monkeypatch):
+    def _slow(query, limit):
+        time.sleep(1)
+        return []
+
+    monkeypatch.setitem(news.SOURCES, "slow", _slow)
+    monkeypatch.setattr(news, "DEADLINE_SECONDS", 0.2)
+    monkeypatch.setenv("NEWS_SOURCES", "google_us,slow")
+    t = time.perf_counter()
+    headlines = get_headlines("2025-01-02")
+    assert time.perf_counter() - t < 0.9
+    assert headlines[0].title == "Quantum chip ships"
+
+def test_topic_query_per_recipient(monkeypatch):
+    monkeypatch.setenv("NEWS_RECIPIENT_QUERIES", '{"CEO@example.com": "robotics"}')
+    monkeypatch.setenv("NEWS_QUERY", "quantum")
+    monkeypatch.setenv("RECIPIENT", "ceo@example.com")
+    assert topic_query() == "robotics"
+    assert topic_query("cfo@example.com") == "quantum"
+    monkeypatch.delenv("NEWS_QUERY")
+    assert topic_query("cfo@example.com") == news.DEFAULT_QUERY
@@ -0,0 +1,146 @@
+import pytest
+from brief_agent.utils import postprocess
+from brief_agent.utils.emailer import send_email
+from brief_agent.utils.postprocess import clean_url, finalize, minify_html, prefetch_links, render_text
+
+REDIRECT = "https://news.google.com/rss/articles/CBMiXmh0dHBzOi8vd3d3LmV4YW1wbGUuY29t?oc=5"
+ARTICLE = "https://www.example.com/quantum?utm_source=google&id=7"
+
+HTML = f"""
+<div style="font-family: Arial, sans-serif; color: #333;">
+  <table style="border-collapse: collapse;">
+    <tr><td style="border: 1px solid #ddd; padding: 8px;">Quantum chip ships</td>
+        <td style="border:1px solid #ddd;padding:8px"><a href="{REDIRECT}">link</a></td></tr>
+  </table>
+</div>
+"""
+
+PAYLOADS = {
+    "get_headlines": [{"title": "Quantum chip ships", "url": REDIRECT}],
+    "get_meetings": {"timezone": "AEST", "meetings": [{"start": "09:00", "end": "09:30", "summary": "Standup"}],
+                     "all_day": ["Public holiday"], "conflicts": []},
+    "get_weather": {"min_c": 11.0, "max_c": 22.5, "rain_chance_pct": 60, "umbrella_at": ["14:00"]},
+    "get_financials": {"aud_usd": 0.6543, "nasdaq_close": 15000.0},
+}
+
+class DummyResponse:
+    def __init__(self, url):
+        self.url = url
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch, tmp_path):
+    heads = []
+
+    def fake_head(url, allow_redirects=False, timeout=None):
+        heads.append(url)
+        return DummyResponse(ARTICLE)
+
+    monkeypatch.setattr(postprocess, "_cache", {})
+    monkeypatch.setattr(postprocess, "_pending", {})
+    monkeypatch.setattr(postprocess, "_cache_loaded", False)
+    monkeypatch.setenv("LINK_CACHE", str(tmp_path / "links.json"))
+    monkeypatch.delenv("EMAIL_STYLE_CLASSES", raising=False)
+    monkeypatch.setattr("requests.head", fake_head)
+    return heads
+
+def test_minify_html_keeps_styles_inline():
+    out = minify_html(HTML)
+    assert "<style>" not in out and "class=" not in out
+    assert out.count('style="border:1px solid #ddd;padding:8px"') == 2
+    assert '<div style="font-family:Arial, sans-serif;color:#333">' in out
+    assert ">\n" not in out and len(out) < len(HTML)
+
+def test_minify_html_extracts_classes_when_asked():
+    out = minify_html(HTML, extract_classes=True)
+    assert out.startswith("<style>.s0{border:1px solid #ddd;padding:8px}</style>")
+    assert out.count('class="s0"') == 2
+
+def test_minify_html_keeps_inline_spaces_and_pre():
+    out = minify_html("<p>Hello <b>world</b>\n  <i>again</i></p>\n<pre>a\n  <b>b</b>\n</pre>")
+    assert out == "<p>Hello <b>world</b> <i>again</i></p><pre>a\n  <b>b</b>\n</pre>"
+
+def test_minify_html_style_quoting_and_data_urls():
+    out = minify_html("""<div style='font-family: "Segoe UI", Arial;'>a</div>"""
+                      """<td style="background: url(data:image/png;base64,AAA=); padding: 4px">b</td>""")
+    assert """<div style='font-family:"Segoe UI", Arial'>""" in out
+    assert '<td style="background:url(data:image/png;base64,AAA=);padding:4px">' in out
+
+def test_clean_url_drops_tracking_params():
+    assert clean_url(ARTICLE) == "https://www.example.com/quantum?id=7"
+
+def test_finalize_rewrites_prefetched_links_and_builds_text(isolated):
+    prefetch_links([REDIRECT, REDIRECT])
+    html, text = finalize(HTML, PAYLOADS, "2025-01-02")
+    assert isolated == [REDIRECT]
+    assert 'href="https://www.example.com/quantum?id=7"' in html and REDIRECT not in html
+    assert "https://www.example.com/quantum?id=7" in text
+    assert "- 09:00-09:30: Standup" in text
+    assert "- All day: Public holiday" in text
+    assert "Umbrella advisable at 14:00" in text
+    assert "AUD -> USD: 0.6543" in text
+    # cached across runs
+    postprocess._cache.clear()
+    postprocess._cache_loaded = False
+    prefetch_links([REDIRECT])
+    assert isolated == [REDIRECT]
+
+def test_finalize_rewrites_only_this_runs_headlines():
+    old = "https://news.google.com/rss/articles/OLD"
+    postprocess._cache[old] = ("https://www.example.com/old", 0.0)
+    postprocess._cache_loaded = True
+    html, _ = finalize(f'<a href="{old}">old</a>', {}, "2025-01-02")
+    assert old in html
+
+def test_link_cache_drops_entries_past_max_age(monkeypatch, tmp_path):
+    import json, time
+
+    monkeypatch.setenv("LINK_CACHE_DAYS", "30")
+    stale = "https://news.google.com/rss/articles/STALE"
+    postprocess._cache[stale] = ("https://www.example.com/stale", time.time() - 31 * 86400)
+    postprocess._cache_loaded = True
+    prefetch_links([REDIRECT, ARTICLE])
+    assert postprocess.resolved_links([REDIRECT, ARTICLE]) == {
+        REDIRECT: "https://www.example.com/quantum?id=7", ARTICLE: "https://www.example.com/quantum?id=7",
+    }
+    saved = json.loads((tmp_path / "links.json").read_text())
+    assert list(saved) == [REDIRECT]  # no stale entry, no plain (non-redirect) link
+
+def test_finalize_budget_counts_html_only():
+    html, text = finalize(HTML, PAYLOADS, "2025-01-02")
+    budget = len(html.encode())
+    assert finalize(HTML, PAYLOADS, "2025-01-02", budget=budget)[0] == html
+    html, text = finalize(HTML, PAYLOADS, "2025-01-02", budget=budget - 1)
+    assert html is None
+
+def test_finalize_truncates_text_on_line_boundary():
+    full = render_text(PAYLOADS, "2025-01-02")
+    budget = len(full.encode()) - 5
+    html, text = finalize(HTML * 10, PAYLOADS, "2025-01-02", budget=budget)
+    assert html is None
+    assert len(text.encode()) <= budget
+    assert text.endswith("\n") and full.startswith(text)
+
+def test_render_text_omits_empty_sections():
+    text = render_text({"get_financials": PAYLOADS["get_financials"]}, "2025-01-02")
+    assert "MEETINGS" not in text and "MARKETS OVERNIGHT" in text
+
+def test_send_email_builds_multipart_alternative(monkeypatch):
+    sent = []
+
+    class FakeSMTP:
+        def __init__(self, host, port):
+            pass
+        def __enter__(self):
+            return self
+        def __exit__(self, *exc):
+            return False
+        def login(self, user, pwd):
+            pass
+        def send_message(self, msg):
+            sent.append(msg)
+
+    monkeypatch.setattr("brief_agent.utils.emailer.smtplib.SMTP_SSL", FakeSMTP)
+    send_email("Briefing", "<p>hi</p>", text="hi")
+    msg = sent[0]
+    assert msg.get_content_type() == "multipart/alternative"
+    assert [p.get_content_type() for p in msg.iter_parts()] == ["text/plain", "text/html"]
@@ -0,0 +1,46 @@
+import os
+
+from brief_agent.utils.profiling import profiled, should_profile
+
+def _busy_parse():
+    import json
+    blob = json.dumps([{"title": f"headline {i}", "url": f"https://example.com/{i}"} for i in range(2000)])
+    for _ in range(40):
+        json.loads(blob)
+
+def test_profiled_writes_collapsed_stacks_and_allocations(tmp_path):
+    with profiled("run", deterministic=True, out_dir=str(tmp_path)) as base:
+        _busy_parse()
+    assert os.path.dirname(base) == str(tmp_path)
+    collapsed = open(base + ".collapsed").read()
+    main = [line for line in collapsed.splitlines() if line.startswith("MainThread;") and "_busy_parse" in line]
+    assert main and all(int(line.rsplit(" ", 1)[1]) >= 1 for line in main)
+    assert open(base + ".alloc.txt").read().startswith("peak traced memory:")
+    assert "_busy_parse" in open(base + ".pstats.txt").read()
+
+def test_sampled_mode_skips_cprofile(tmp_path):
+    with profiled("fetch", out_dir=str(tmp_path)) as base:
+        _busy_parse()
+    assert os.path.exists(base + ".collapsed")
+    assert not os.path.exists(base + ".pstats.txt")
+
+def test_should_profile_follows_sample_rate(monkeypatch):
+    monkeypatch.setenv("PROFILE_SAMPLE_RATE", "0")
+    assert not should_profile()
+    monkeypatch.setenv("PROFILE_SAMPLE_RATE", "1")
+    assert should_profile()
+    monkeypatch.setenv("PROFILE_SAMPLE_RATE", "5%")
+    assert not should_profile()
+
+def test_report_write_failure_does_not_raise(tmp_path):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    with profiled("run", out_dir=str(blocker)):
+        _busy_parse()
+
+def test_report_names_are_unique_within_a_second(tmp_path):
+    with profiled("run", out_dir=str(tmp_path)) as first:
+        pass
+    with profiled("run", out_dir=str(tmp_path)) as second:
+        pass
+    assert first != second
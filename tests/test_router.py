@@ -0,0 +1,136 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from brief_agent import agent_runner
+from brief_agent.router import SYNTHESIS, TOOL_SELECTION, Router, cost_usd, validate_body
+
+MESSAGES = [{"role": "user", "content": "x" * 4000}]  # ~1000 prompt tokens
+MEETINGS = {"timezone": "AEDT", "meetings": [{"start": "09:00", "end": "09:30", "summary": "Standup"},
+                                             {"start": "14:00", "end": "15:00", "summary": "Client"}]}
+
+def test_synthesis_uses_large_model_within_budget():
+    router = Router(large_model="gpt-4-0613", small_model="gpt-4o-mini")
+    assert router.choose(SYNTHESIS, MESSAGES).model == "gpt-4-0613"
+    assert router.choose(TOOL_SELECTION, MESSAGES).model == "gpt-4o-mini"
+
+def test_synthesis_downgrades_when_cost_budget_is_spent():
+    router = Router(large_model="gpt-4-0613", small_model="gpt-4o-mini", cost_budget_usd=0.10)
+    router.charge("gpt-4-0613", 2000, 200)
+    decision = router.choose(SYNTHESIS, MESSAGES)
+    assert decision.model == "gpt-4o-mini" and "remaining" in decision.reason
+
+def test_synthesis_downgrades_when_latency_budget_is_spent():
+    router = Router(large_model="gpt-4-0613", small_model="gpt-4o-mini", latency_budget_s=10)
+    assert router.choose(SYNTHESIS, MESSAGES).model == "gpt-4o-mini"
+
+def test_settings_are_read_when_the_router_is_built(monkeypatch):
+    monkeypatch.setenv("SMALL_MODEL", "gpt-4o")
+    monkeypatch.setenv("RUN_COST_BUDGET_USD", "1.5")
+    monkeypatch.setenv("ROUTE_PREFETCH_TOOLS", "0")
+    router = Router(large_model="gpt-4-0613")
+    assert (router.small_model, router.cost_budget_usd, router.prefetch_tools) == ("gpt-4o", 1.5, False)
+    assert router.plan_tools("2025-01-02", agent_runner.TOOL_NAMES) == []
+
+def test_cost_and_validation_helpers():
+    assert cost_usd("gpt-4o-mini", 1000, 1000) == pytest.approx(0.00075)
+    assert validate_body("<div><h1>Briefing</h1></div>")
+    assert not validate_body("") and not validate_body("Sorry, I can't help.")
+
+def _message(content=None, function_call=None):
+    msg = SimpleNamespace(content=content, function_call=function_call)
+    msg.model_dump = lambda: {"role": "assistant", "content": content}
+    return msg
+
+def _call(name, arguments="{}"):
+    return _message(function_call=SimpleNamespace(name=name, arguments=arguments))
+
+def _tool_call(name):
+    return _call(name, json.dumps({} if name == "get_financials" else {"iso_date": "2025-01-02"}))
+
+class FakeCompletions:
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.models = []
+
+    def create(self, model, messages, functions, function_call):
+        self.models.append(model)
+        usage = SimpleNamespace(prompt_tokens=1000, completion_tokens=500)
+        return SimpleNamespace(choices=[SimpleNamespace(message=self.replies.pop(0))], usage=usage)
+
+@pytest.fixture
+def fake_run(monkeypatch, tmp_path):
+    tools, tool_args, sent = [], {}, []
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("LOG_DIR", str(tmp_path))
+
+    def fake_call_tool(name, args):
+        tools.append(name)
+        if args.get("page_size", 0) < 0:
+            raise ValueError("page_size must be positive")
+        tool_args[name] = args
+        return MEETINGS if name == "get_meetings" else []
+
+    monkeypatch.setattr(agent_runner, "call_tool", fake_call_tool)
+    monkeypatch.setattr("brief_agent.utils.emailer.send_email", lambda subject, html, text=None: sent.append(html))
+    monkeypatch.setattr("brief_agent.utils.postprocess.finalize", lambda html, payloads, day: (html, "text"))
+
+    def run(replies, **router_kwargs):
+        completions = FakeCompletions(replies)
+        client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        monkeypatch.setattr("openai.OpenAI", lambda api_key: client)
+        monkeypatch.setattr(agent_runner, "Router",
+                            lambda **kw: Router(**{**kw, "small_model": "gpt-4o-mini", **router_kwargs}))
+        usage = {"prompt_tokens": 0, "completion_tokens": 0}
+        agent_runner._run_briefing("2025-01-02", agent_runner._setup_logger("2025-01-02"), usage)
+        run.tool_args = tool_args
+        return completions.models, tools, sent, usage
+
+    return run
+
+def test_run_skips_tool_selection_turns_and_synthesises_once(fake_run):
+    models, tools, sent, usage = fake_run([_message("<h1>Briefing</h1>")])
+    assert models == ["gpt-4-0613"]
+    assert sorted(tools) == sorted(agent_runner.TOOL_NAMES)
+    assert sent == ["<h1>Briefing</h1>"]
+    assert usage == {"prompt_tokens": 1000, "completion_tokens": 500}
+
+def test_planned_weather_call_gets_meeting_start_times(fake_run):
+    fake_run([_message("<h1>Briefing</h1>")])
+    assert fake_run.tool_args["get_weather"] == {"iso_date": "2025-01-02", "meeting_times": ["09:00", "14:00"]}
+    assert fake_run.tool_args["get_headlines"] == {"iso_date": "2025-01-02"}
+
+def test_run_falls_back_to_large_model_on_invalid_small_output(fake_run):
+    models, _, sent, _ = fake_run(
+        [_message("plain text, no html"), _message("<h1>Briefing</h1>")], cost_budget_usd=0.0,
+    )
+    assert models == ["gpt-4o-mini", "gpt-4-0613"]
+    assert sent == ["<h1>Briefing</h1>"]
+
+def test_run_without_prefetch_routes_tool_selection_to_small_model(fake_run):
+    calls = [_tool_call(name) for name in agent_runner.TOOL_NAMES]
+    models, tools, _, _ = fake_run(calls + [_message("<h1>Briefing</h1>")], prefetch_tools=False)
+    assert models == ["gpt-4o-mini"] * 4 + ["gpt-4-0613"]
+    assert tools == list(agent_runner.TOOL_NAMES)
+
+@pytest.mark.parametrize("bad_turn", [
+    _call("get_headlines", '{"iso_date": "2025-01-02"'),  # malformed arguments
+    _call("get_stock_tips"),                              # unknown function
+    _call("get_headlines", '{"page_size": 5}'),           # missing iso_date
+    _call("get_weather", '{"iso_date": "today"}'),        # invalid iso_date
+    _message("<h1>Briefing</h1>"),                        # e-mail before all tools ran
+])
+def test_run_without_prefetch_retries_bad_small_turns_on_large_model(fake_run, bad_turn):
+    replies = [bad_turn] + [_tool_call(name) for name in agent_runner.TOOL_NAMES] + [_message("<h1>Briefing</h1>")]
+    models, tools, sent, _ = fake_run(replies, prefetch_tools=False)
+    assert models == ["gpt-4o-mini", "gpt-4-0613"] + ["gpt-4o-mini"] * 3 + ["gpt-4-0613"]
+    assert tools == list(agent_runner.TOOL_NAMES)
+    assert sent == ["<h1>Briefing</h1>"]
+
+def test_run_without_prefetch_retries_failing_small_tool_call_on_large_model(fake_run):
+    replies = ([_call("get_headlines", '{"iso_date": "2025-01-02", "page_size": -1}')]
+               + [_tool_call(name) for name in agent_runner.TOOL_NAMES] + [_message("<h1>Briefing</h1>")])
+    models, tools, sent, _ = fake_run(replies, prefetch_tools=False)
+    assert models == ["gpt-4o-mini", "gpt-4-0613"] + ["gpt-4o-mini"] * 3 + ["gpt-4-0613"]
+    assert tools == ["get_headlines"] * 3 + list(agent_runner.TOOL_NAMES)  # 3 attempts, then fallback
+    assert sent == ["<h1>Briefing</h1>"]
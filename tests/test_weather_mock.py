@@ -0,0 +1,115 @@
+import pytest
+from brief_agent.tools import weather
+from brief_agent.tools.weather import get_hourly, get_weather, get_weather_bulk, umbrella_times
+from brief_agent.schema import Weather
+
+class DummyResponse:
+    def __init__(self, data):
+        self._data = data
+    def raise_for_status(self):
+        pass
+    def json(self):
+        return self._data
+
+def _forecast(base_temp):
+    days = []
+    for i, iso in enumerate(["2025-01-02", "2025-01-03", "2025-01-04"]):
+        days.append({
+            "date": iso,
+            "day": {"mintemp_c": base_temp + i, "maxtemp_c": base_temp + i + 10.0, "daily_chance_of_rain": 10 * i},
+            "hour": [
+                {"time": f"{iso} {h:02d}:00", "temp_c": base_temp + h / 2, "chance_of_rain": 80 if h == 14 else 5}
+                for h in range(24)
+            ],
+        })
+    return {"forecastday": days}
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    def fake_get(url, params=None):
+        calls.append(("get", params["q"]))
+        return DummyResponse({"forecast": _forecast(10.0)})
+
+    def fake_post(url, params=None, json=None):
+        calls.append(("post", [loc["q"] for loc in json["locations"]]))
+        return DummyResponse({"bulk": [
+            {"query": {"custom_id": loc["custom_id"], "q": loc["q"], "forecast": _forecast(20.0)}}
+            for loc in json["locations"]
+        ]})
+
+    monkeypatch.setenv("WEATHER_API_KEY", "test")
+    monkeypatch.setenv("LOCATION", "Melbourne")
+    monkeypatch.setattr(weather, "_FORECAST_CACHE", {})
+    monkeypatch.setattr("brief_agent.tools.weather.requests.get", fake_get)
+    monkeypatch.setattr("brief_agent.tools.weather.requests.post", fake_post)
+    return calls
+
+def test_get_weather_uses_requested_date_and_cache(calls):
+    w = get_weather("2025-01-03")
+    assert w == Weather(min_c=11.0, max_c=21.0, rain_chance_pct=10)
+    # later date in the same forecast range is served locally
+    assert get_weather("2025-01-04").min_c == 12.0
+    assert calls == [("get", "Melbourne")]
+
+def test_get_weather_bulk_fetches_missing_locations_in_one_call(calls):
+    from brief_agent.utils import metrics
+
+    get_weather("2025-01-02")
+    hits = metrics.CACHE_REQUESTS.value(cache="weather", result="hit")
+    misses = metrics.CACHE_REQUESTS.value(cache="weather", result="miss")
+    result = get_weather_bulk("2025-01-02", ["Melbourne", "Sydney", "Perth"])
+    assert result["Melbourne"].min_c == 10.0
+    assert result["Sydney"].min_c == 20.0
+    assert calls == [("get", "Melbourne"), ("post", ["Sydney", "Perth"])]
+    assert metrics.CACHE_REQUESTS.value(cache="weather", result="hit") - hits == 1
+    assert metrics.CACHE_REQUESTS.value(cache="weather", result="miss") - misses == 2
+
+def test_hourly_and_umbrella_served_from_cache(calls):
+    hours = get_hourly("2025-01-02")
+    assert len(hours) == 24
+    assert umbrella_times("2025-01-02", ["09:30", "14:00", "16:00"]) == ["14:00"]
+    assert calls == [("get", "Melbourne")]
+
+def test_get_weather_outside_forecast_range_raises(calls):
+    with pytest.raises(RuntimeError):
+        get_weather("2025-02-01")
+
+def test_umbrella_times_skips_malformed_entries(calls):
+    assert umbrella_times("2025-01-02", ["2pm", "2025-01-02T14:00:00Z", "14:00", None]) == ["14:00"]
+
+def test_call_tool_fetches_extra_locations_in_bulk(calls):
+    from brief_agent.agent_runner import call_tool
+
+    payload = call_tool("get_weather", {"iso_date": "2025-01-02", "locations": ["Sydney", "Perth"],
+                                        "meeting_times": ["14:00"]})
+    assert calls == [("post", ["Melbourne", "Sydney", "Perth"])]
+    assert payload["min_c"] == 20.0
+    assert sorted(payload["locations"]) == ["Perth", "Sydney"]
+    assert payload["umbrella_at"] == ["14:00"]
+
+@pytest.mark.parametrize("bulk_ok", [True, False])
+def test_call_tool_skips_failing_extra_location(calls, monkeypatch, bulk_ok):
+    from brief_agent.agent_runner import call_tool
+
+    def fake_get(url, params=None):
+        calls.append(("get", params["q"]))
+        if params["q"] == "Atlantis":
+            raise RuntimeError("400 Client Error")
+        return DummyResponse({"forecast": _forecast(10.0)})
+
+    def fake_post(url, params=None, json=None):
+        calls.append(("post", [loc["q"] for loc in json["locations"]]))
+        if not bulk_ok:
+            raise RuntimeError("bulk not on plan")
+        return DummyResponse({"bulk": [
+            {"query": {"custom_id": loc["custom_id"], "q": loc["q"], "forecast": _forecast(20.0)}}
+            for loc in json["locations"] if loc["q"] != "Atlantis"
+        ]})
+
+    monkeypatch.setattr("brief_agent.tools.weather.requests.get", fake_get)
+    monkeypatch.setattr("brief_agent.tools.weather.requests.post", fake_post)
+    payload = call_tool("get_weather", {"iso_date": "2025-01-02", "locations": ["Atlantis", "Sydney"]})
+    assert payload["min_c"] == (20.0 if bulk_ok else 10.0)
+    assert list(payload["locations"]) == ["Sydney"]